@@ -131,6 +131,44 @@ STATUS_ENDPOINT_URL = 'http://{}:8888/status'
 
 RPC_URL = 'http://{}:7777/rpc'
 
+# Node status polling limits
+STATUS_TIMEOUT = int(os.environ.get("STATUS_TIMEOUT", 10))
+STATUS_CONCURRENCY = int(os.environ.get("STATUS_CONCURRENCY", 500))
+
+# Node health tracking, timeout of responsive nodes adapts to their observed latency,
+# failing nodes are probed with exponential backoff and archived after days without a response,
+# archived nodes are still probed once per max backoff and restored when they respond or get an active bid
+STATUS_MIN_TIMEOUT = int(os.environ.get("STATUS_MIN_TIMEOUT", 2))
+STATUS_TIMEOUT_FACTOR = int(os.environ.get("STATUS_TIMEOUT_FACTOR", 4))
+STATUS_BACKOFF = int(os.environ.get("STATUS_BACKOFF", 5 * 60))
+STATUS_MAX_BACKOFF = int(os.environ.get("STATUS_MAX_BACKOFF", 24 * 60 * 60))
+STATUS_ARCHIVE_DAYS = int(os.environ.get("STATUS_ARCHIVE_DAYS", 7))
+
+# Number of consistent hash shards polled by separate Celery tasks, 0 polls all nodes within the monitoring task
+STATUS_SHARDS = int(os.environ.get("STATUS_SHARDS", 0))
+
+# Pooled HTTP client shared by a monitoring cycle
+HTTP_POOL_LIMIT = int(os.environ.get("HTTP_POOL_LIMIT", STATUS_CONCURRENCY))
+HTTP_POOL_LIMIT_PER_HOST = int(os.environ.get("HTTP_POOL_LIMIT_PER_HOST", 4))
+HTTP_DNS_CACHE_TTL = int(os.environ.get("HTTP_DNS_CACHE_TTL", 300))
+HTTP_KEEPALIVE_TIMEOUT = int(os.environ.get("HTTP_KEEPALIVE_TIMEOUT", 30))
+
+# Number of rows written by a single bulk query
+DB_BATCH_SIZE = int(os.environ.get("DB_BATCH_SIZE", 1000))
+SCORE_BATCH_SIZE = int(os.environ.get("SCORE_BATCH_SIZE", DB_BATCH_SIZE))
+
+# Derive day scoring from running day counters instead of recomputing it from all day Score rows
+DAY_SCORING_INCREMENTAL = os.environ.get("DAY_SCORING_INCREMENTAL", "True") == "True"
+
+# Engine which makes day, week and quarter scoring: `orm` or `vectorized` (NumPy)
+SCORING_ENGINE = os.environ.get("SCORING_ENGINE", "orm")
+
+# Number of public keys eligible for rewards each week
+ELIGIBLE_FOR_REWARDS_LIMIT = int(os.environ.get("ELIGIBLE_FOR_REWARDS_LIMIT", 100))
+
+# Number of days raw Score rows are kept before being purged, closed days are compacted into rollups
+SCORE_RETENTION_DAYS = int(os.environ.get("SCORE_RETENTION_DAYS", 30))
+
 CASPER_STATUS_HEADERS = {
     'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8,'
               'application/signed-exchange;v=b3;q=0.7',
@@ -152,14 +190,44 @@ TRUSTED_RPC = 'https://cnm.casperlabs.io/network/casper-test/detail'
 
 CSRF_TRUSTED_ORIGINS = ['https://s4c.pro']
 
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": os.environ.get("CACHE_URL", "redis://redis:6379/1"),
+    }
+}
+
+# Scoring API responses are cached until the next scoring cycle, but not longer than this number of seconds
+SCORING_CACHE_TIMEOUT = int(os.environ.get("SCORING_CACHE_TIMEOUT", 60 * 60))
+
+# Default and max number of rows returned by a single scoring API response, use `limit` and `offset` to page
+SCORING_PAGE_SIZE = int(os.environ.get("SCORING_PAGE_SIZE", 1000))
+SCORING_MAX_PAGE_SIZE = int(os.environ.get("SCORING_MAX_PAGE_SIZE", 10000))
+
+# Max number of days of a single public key history request
+SCORING_HISTORY_MAX_DAYS = int(os.environ.get("SCORING_HISTORY_MAX_DAYS", 31))
+
 CELERY_BROKER_URL = 'redis://redis:6379/0'
 CELERY_RESULT_BACKEND = 'redis://redis:6379/0'
 
 CELERY_BROKER_CONNECTION_RETRY_ON_STARTUP = True
 
+# Monitoring cycle deadlines in seconds since its start, status and auction requests are cut at the poll deadline,
+# scoring steps are not started after the cycle deadline, lease keeps cycles from overlapping
+CYCLE_POLL_DEADLINE = int(os.environ.get("CYCLE_POLL_DEADLINE", 3 * 60))
+CYCLE_DEADLINE = int(os.environ.get("CYCLE_DEADLINE", 4 * 60))
+CYCLE_LEASE_TIMEOUT = int(os.environ.get("CYCLE_LEASE_TIMEOUT", 10 * 60))
+
 CELERY_BEAT_SCHEDULE = {
     'monitoring': {
         'task': 'src.core.tasks.monitoring',
-        'schedule': crontab(minute='*/5')
+        'schedule': crontab(minute='*/5'),
+        # Interval not started before the cycle deadline is dropped instead of piling up behind a slow cycle,
+        # it is recorded as skipped
+        'options': {'expires': CYCLE_DEADLINE}
+    },
+    'rollup': {
+        'task': 'src.core.tasks.rollup',
+        'schedule': crontab(hour=0, minute=15)
     },
 }
@@ -6,34 +6,93 @@ import aiohttp
 from bs4 import BeautifulSoup
 import time
 import json
+import contextlib
+import functools
+import uuid
+from concurrent.futures import ProcessPoolExecutor
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
 os.environ["DJANGO_ALLOW_ASYNC_UNSAFE"] = "true"
 django.setup()
 from django.conf import settings
-from src.core import models
+from django.db import connections, transaction
+from django.db.models import Count, Min, OuterRef, Q, Subquery, Sum
+from django.utils import timezone
+from src.core import cache, models
+from src.casper import sharding, vectorized
 
 
-async def get_status(ip: str) -> (str, dict,):
-    """Gets status endpoint response for Casper Testnet node using given IP address."""
+def get_session() -> aiohttp.ClientSession:
+    """Creates pooled Aiohttp session shared by all requests of a monitoring cycle."""
+
+    # One connector per cycle keeps connections alive and caches DNS between requests
+    connector = aiohttp.TCPConnector(
+        ssl=False,
+        limit=settings.HTTP_POOL_LIMIT,
+        limit_per_host=settings.HTTP_POOL_LIMIT_PER_HOST,
+        ttl_dns_cache=settings.HTTP_DNS_CACHE_TTL,
+        keepalive_timeout=settings.HTTP_KEEPALIVE_TIMEOUT
+    )
+
+    return aiohttp.ClientSession(trust_env=True, connector=connector)
+
+
+async def get_status(session, semaphore, ip: str, timeout: float = None) -> (str, dict, float,):
+    """Gets status endpoint response and its latency for Casper Testnet node using given IP address."""
+
+    start_time = None
 
     try:
-        # Use Aiohttp session to make async requests
-        async with aiohttp.ClientSession(
-                headers=settings.CASPER_STATUS_HEADERS,
-                trust_env=True,
-                connector=aiohttp.TCPConnector(ssl=False)
-        ) as session:
+        # Semaphore caps the number of in-flight requests, so the timeout
+        # is not spent waiting for a free connection in the pool
+        async with semaphore:
+            start_time = time.time()
             resp = await session.request(
                 method='GET',
                 url=settings.STATUS_ENDPOINT_URL.format(ip),
-                timeout=10  # Wait response for 10 seconds
+                headers=settings.CASPER_STATUS_HEADERS,
+                timeout=timeout or settings.STATUS_TIMEOUT  # Wait response for 10 seconds by default
             )
             resp_json = await resp.json()
-        return ip, resp_json
+        return ip, resp_json, time.time() - start_time
     except Exception as error:
         # Return dict with error if node does not respond
-        return ip, {'error': str(error).strip()}
+        return ip, {'error': str(error).strip()}, time.time() - start_time if start_time else None
+
+
+def _get_status_timeout(node) -> float:
+    """Gets status request timeout of the node adapted to its observed latency."""
+
+    # Validators are always given the full timeout, so their scoring does not depend on latency history
+    if node.active_bid or node.latency is None:
+        return settings.STATUS_TIMEOUT
+
+    return min(max(node.latency * settings.STATUS_TIMEOUT_FACTOR, settings.STATUS_MIN_TIMEOUT),
+               settings.STATUS_TIMEOUT)
+
+
+def _update_node_health(node, resp: dict, latency: float, now: datetime.datetime) -> None:
+    """Updates consecutive failures, last success, latency and next poll time of the node by its status response."""
+
+    if 'error' not in resp:
+        node.failures, node.failing_since, node.last_success, node.next_poll = 0, None, now, None
+        node.archived = False
+        # Latency is smoothed, so one slow response does not shrink or stretch the timeout
+        node.latency = latency if node.latency is None else node.latency * 0.8 + latency * 0.2
+        return
+
+    node.failures += 1
+    node.failing_since = node.failing_since or now
+
+    # Failing node is probed again after exponentially growing backoff
+    node.next_poll = now + datetime.timedelta(
+        seconds=min(settings.STATUS_BACKOFF * 2 ** (node.failures - 1), settings.STATUS_MAX_BACKOFF)
+    )
+
+    # Node which has not responded for days is only probed once per max backoff and is not scored
+    if not node.active_bid and node.failing_since <= now - datetime.timedelta(days=settings.STATUS_ARCHIVE_DAYS):
+        node.archived = True
+        node.next_poll = now + datetime.timedelta(seconds=settings.STATUS_MAX_BACKOFF)
 
 
 async def get_cnm_ips(session) -> set:
@@ -45,6 +104,7 @@ async def get_cnm_ips(session) -> set:
         resp = await session.request(
             method='GET',
             url=settings.TRUSTED_RPC,
+            headers=settings.CNM_HEADERS,
             timeout=30
         )
         resp_text = await resp.text()
@@ -59,25 +119,33 @@ async def get_cnm_ips(session) -> set:
     return ips
 
 
-async def update_peers() -> None:
+def _create_nodes(ips: set, known_ips: set) -> int:
+    """Creates nodes in Database for given IP addresses which are not known yet."""
+
+    new_ips = ips - known_ips
+
+    # Conflicts are ignored, so concurrent runs can not create duplicate IP addresses
+    models.Node.objects.bulk_create(
+        (models.Node(ip=ip) for ip in new_ips),
+        batch_size=settings.DB_BATCH_SIZE,
+        ignore_conflicts=True
+    )
+
+    return len(new_ips)
+
+
+async def update_peers(session) -> None:
     """Updates all Casper Testnet peers from CNM in Database."""
 
     peers = set()
 
-    async with aiohttp.ClientSession(
-            headers=settings.CNM_HEADERS,
-            trust_env=True,
-            connector=aiohttp.TCPConnector(ssl=False)
-    ) as session:
-        cnm_ips = await get_cnm_ips(session)
-        peers.update(cnm_ips)
+    cnm_ips = await get_cnm_ips(session)
+    peers.update(cnm_ips)
 
     print(datetime.datetime.now(), 'Peers From CNM:', len(peers))
 
-    for peer in peers:
-        # Add peer to Database if it does not exist there
-        if not models.Node.objects.filter(ip=peer).exists():
-            models.Node.objects.create(ip=peer)
+    # Add peers to Database if they do not exist there
+    _create_nodes(peers, set(models.Node.objects.values_list('ip', flat=True)))
 
 
 async def get_auction_info(session) -> dict:
@@ -98,6 +166,7 @@ async def get_auction_info(session) -> dict:
                 method='POST',
                 url='https://rpc.testnet.casperlabs.io/rpc',
                 data=payload,
+                headers={'Content-Type': 'application/json'},
                 timeout=30
             )
             resp_json = await resp.json()
@@ -109,19 +178,12 @@ async def get_auction_info(session) -> dict:
         return {}
 
 
-async def update_auction_info() -> None:
-    """Updates auction info for all nodes present in Database."""
-
-    async with aiohttp.ClientSession(
-        headers={'Content-Type': 'application/json'},
-        trust_env=True,
-        connector=aiohttp.TCPConnector(ssl=False)
-    ) as session:
-        auction_info = await get_auction_info(session)
+async def update_auction_info(auction_info: dict, nodes: dict) -> dict:
+    """Updates auction info for given nodes loaded from Database."""
 
     # Check if an auction info is successfully fetched
     if not auction_info:
-        return
+        return nodes
 
     network_weight, validators = 0, set()
 
@@ -132,42 +194,159 @@ async def update_auction_info() -> None:
 
     print(datetime.datetime.now(), f'Network Weight {network_weight}, Validators {len(validators)}')
 
-    for bid in auction_info['result']['auction_state']['bids']:
-        # Update auction information for each node in Database
-        for node in models.Node.objects.filter(public_key=bid['public_key'].strip().lower()):
-            node.active_bid = not bid['bid']['inactive']
-            node.network_weight = network_weight
-            node.total_stake = (sum(int(delegator['staked_amount']) for delegator in bid['bid']['delegators']) +
-                                int(bid['bid']['staked_amount']))
-            node.percent_of_network = (node.total_stake * 100) / network_weight if node.public_key in validators else 0
-            node.save()
+    # Map bids by public key, so nodes are matched without querying Database
+    bids = {bid['public_key'].strip().lower(): bid['bid'] for bid in auction_info['result']['auction_state']['bids']}
+
+    updated_nodes = []
+
+    for node in nodes.values():
+        bid = bids.get(node.public_key)
+        if not node.public_key or bid is None:
+            continue
+
+        # Update auction information for each node which has a bid
+        node.active_bid = not bid['inactive']
+        node.network_weight = network_weight
+        node.total_stake = (sum(int(delegator['staked_amount']) for delegator in bid['delegators']) +
+                            int(bid['staked_amount']))
+        node.percent_of_network = (node.total_stake * 100) / network_weight if node.public_key in validators else 0
+        updated_nodes.append(node)
+
+    # Save auction information of all updated nodes in Database
+    models.Node.objects.bulk_update(
+        updated_nodes,
+        ['active_bid', 'network_weight', 'total_stake', 'percent_of_network'],
+        batch_size=settings.DB_BATCH_SIZE
+    )
+
+    # Archived nodes which got an active bid are restored, so they are polled and scored from the next cycle
+    restored = models.Node.objects.filter(
+        archived=True,
+        public_key__in=[public_key for public_key, bid in bids.items() if not bid['inactive']]
+    ).update(archived=False, active_bid=True, next_poll=None)
+
+    if restored:
+        print(datetime.datetime.now(), f'Restored {restored} Archived Nodes With Active Bids')
+
+    print(datetime.datetime.now(), 'Bids Fetched')
+
+    return nodes
+
+
+@contextlib.contextmanager
+def stage(timings: dict, name: str):
+    """Measures wall time of a cycle stage in seconds."""
+
+    start_time = time.time()
+    try:
+        yield
+    finally:
+        timings[name] = time.time() - start_time
+
+
+async def run_pipeline(stages: dict, timings: dict) -> dict:
+    """
+    Runs stages given as {name: (function, dependencies)} concurrently, each stage starts
+    as soon as its dependencies are finished and gets their results as arguments.
+    """
 
+    tasks = {}
 
-async def monitoring_score() -> None:
-    """Monitoring score for all nodes present in Database."""
+    async def run_stage(name, function, dependencies):
+        results = [await tasks[dependency] for dependency in dependencies]
 
-    # Get all IP addresses from Database
-    peers, new_peers = set(models.Node.objects.all().values_list('ip', flat=True)), set()
+        # Waiting for dependencies is not counted in stage timing
+        with stage(timings, name):
+            return await function(*results)
+
+    for name, (function, dependencies) in stages.items():
+        tasks[name] = asyncio.create_task(run_stage(name, function, dependencies))
+
+    try:
+        return {name: await task for name, task in tasks.items()}
+    finally:
+        # Stages depending on a failed one would wait forever
+        for task in tasks.values():
+            task.cancel()
+
+
+async def load_peers(session) -> dict:
+    """Gets IP addresses of nodes due to be polled in the current cycle with their status request timeouts."""
 
     # If there are no IP addresses in Database, then update Database with IP addresses scraped from CNM
     # Will be executed only at the first launch
-    if not peers:
-        await update_peers()
-
-        peers = set(models.Node.objects.all().values_list('ip', flat=True))
+    if not models.Node.objects.exists():
+        await update_peers(session)
+
+    # Healthy nodes and validators are polled every cycle, failing and archived nodes once their backoff is over
+    peers = {
+        node.ip: _get_status_timeout(node)
+        for node in models.Node.objects.filter(
+            Q(archived=False, active_bid=True) | Q(archived=False, next_poll__isnull=True) |
+            Q(next_poll__lte=timezone.now())
+        ).only('ip', 'active_bid', 'latency')
+    }
 
     print(datetime.datetime.now(), f'Fetched {len(peers)} Peers')
 
+    return peers
+
+
+async def poll_statuses(session, peers: dict, deadline: float = None) -> list:
+    """Gets status endpoint responses of all given IP addresses within their timeouts and the poll deadline."""
+
+    # Limit number of status requests executed at the same time
+    semaphore = asyncio.Semaphore(settings.STATUS_CONCURRENCY)
+
     # Create array with future tasks, will be executed asynchronously
     # Where task is get status endpoint for each IP address
-    tasks = (asyncio.create_task(get_status(ip)) for ip in peers)
+    tasks = [asyncio.create_task(get_status(session, semaphore, ip, timeout)) for ip, timeout in peers.items()]
+
+    if not tasks:
+        return []
+
+    # Requests still running at the deadline are cancelled, their nodes are treated as not polled
+    done, pending = await asyncio.wait(tasks, timeout=max(deadline - time.time(), 0) if deadline else None)
+    for task in pending:
+        task.cancel()
+
+    responses = [task.result() for task in done]
 
-    # Gather all tasks' responses in array
-    responses = await asyncio.gather(*tasks, return_exceptions=True)
+    if pending:
+        print(datetime.datetime.now(), f'Poll Deadline Exceeded, {len(pending)} Statuses Dropped')
 
     print(datetime.datetime.now(), f'Got {len(responses)} Statuses')
 
-    for ip, resp in responses:
+    return responses
+
+
+async def fetch_auction_info(session, deadline: float = None) -> dict:
+    """Gets auction info until the poll deadline, nodes keep their known bids if it is not fetched in time."""
+
+    try:
+        return await asyncio.wait_for(get_auction_info(session),
+                                      max(deadline - time.time(), 0) if deadline else None)
+    except asyncio.TimeoutError:
+        print(datetime.datetime.now(), 'Poll Deadline Exceeded, Auction Info Dropped')
+        return {}
+
+
+async def update_nodes(responses: list) -> dict:
+    """Updates public keys, heights and health of nodes from status responses and adds new peers to Database."""
+
+    new_peers, now = set(), timezone.now()
+
+    # Nodes skipped due to backoff are scored as not responding, the same as a failed request
+    polled = {response[0] for response in responses}
+
+    # Load all nodes at once, so their state can be written back in batches,
+    # archived nodes only when they are probed
+    nodes = {node.ip: node for node in models.Node.objects.filter(Q(archived=False) | Q(ip__in=polled))}
+    for node in nodes.values():
+        if node.ip not in polled:
+            node.height = 0
+
+    for ip, resp, latency in responses:
         # Get Public Key and Height from status endpoint response for each IP if not exists then empty
 
         try:
@@ -180,12 +359,13 @@ async def monitoring_score() -> None:
         except Exception:
             height = 0
 
-        # Save Public Key and Height in Database
-        node = models.Node.objects.get(ip=ip)
-        if pk:
-            node.public_key = pk
-        node.height = height
-        node.save()
+        # Update Public Key and Height of the node in memory
+        node = nodes.get(ip)
+        if node is not None:
+            if pk:
+                node.public_key = pk
+            node.height = height
+            _update_node_health(node, resp, latency, now)
 
         # If node has peers then collect them in set
         if 'peers' in resp:
@@ -193,31 +373,44 @@ async def monitoring_score() -> None:
                 new_peer = peer['address'].split(':')[0]
                 new_peers.add(new_peer)
 
-    print(datetime.datetime.now(), f'Found {len(new_peers)} New Peers')
+    # Save Public Keys, Heights and health of all polled nodes in Database
+    models.Node.objects.bulk_update(
+        nodes.values(),
+        ['public_key', 'height', 'failures', 'failing_since', 'last_success', 'latency', 'next_poll', 'archived'],
+        batch_size=settings.DB_BATCH_SIZE
+    )
+
+    # If peers do not exist in Database, so add them there
+    created = _create_nodes(new_peers, set(models.Node.objects.filter(ip__in=new_peers).values_list('ip', flat=True)))
 
-    for peer in new_peers:
-        # If peer does not exist in Database, so add it there
-        if not models.Node.objects.filter(ip=peer).exists():
-            models.Node.objects.create(ip=peer)
+    print(datetime.datetime.now(), f'Found {len(new_peers)} Peers, {created} New')
+
+    # Archived nodes which are still not responding are not scored
+    return {ip: node for ip, node in nodes.items() if not node.archived}
+
+
+async def save_scores(nodes: dict) -> None:
+    """Saves Score of the current 5 minute interval for each node having public key."""
 
     # Determine maximum height at the network currently
-    max_height = max(models.Node.objects.all().values_list('height', flat=True))
+    max_height = max((node.height for node in nodes.values()), default=0)
 
     print(datetime.datetime.now(), f'Max Height {max_height}')
 
-    await update_auction_info()
+    timestamp_now = datetime.datetime.now()
 
-    print(datetime.datetime.now(), 'Bids Fetched')
+    scores = []
 
-    timestamp_now = datetime.datetime.now()
+    for node in nodes.values():
+        if not node.public_key:
+            continue
 
-    for node in models.Node.objects.exclude(public_key=''):
-        # Create new Score object in Database for each public key for current 5 minute interval
+        # Create new Score object for each public key for current 5 minute interval
         # Field `active` means that at current interval the public key
         # has height within 4 block of maximum height and active bid
         # The following information is also saved in Database for current interval:
         # current height, network weight, total stake, is active bid and percent of network
-        models.Score.objects.create(
+        scores.append(models.Score(
             node=node,
             current_block=node.height,
             network_weight=node.network_weight,
@@ -226,70 +419,239 @@ async def monitoring_score() -> None:
             percent_of_network=node.percent_of_network,
             active=True if (max_height - node.height <= 4) and node.active_bid else False,
             timestamp=timestamp_now
+        ))
+
+    # Save the whole interval snapshot in Database within one transaction
+    with transaction.atomic():
+        models.Score.objects.bulk_create(scores, batch_size=settings.SCORE_BATCH_SIZE)
+        _update_day_counters(timestamp_now.date(), scores)
+
+    print(datetime.datetime.now(), f'Saved {len(scores)} Scores')
+
+
+async def monitoring_score(session, timings: dict = None, deadline: float = None) -> None:
+    """Monitoring score for all nodes present in Database, network requests are limited by the poll deadline."""
+
+    # Auction info does not depend on statuses, so it is fetched while nodes are polled
+    await run_pipeline({
+        'peers': (functools.partial(load_peers, session), ()),
+        'auction_info': (functools.partial(fetch_auction_info, session, deadline=deadline), ()),
+        'statuses': (functools.partial(poll_statuses, session, deadline=deadline), ('peers',)),
+        'nodes': (update_nodes, ('statuses',)),
+        'bids': (update_auction_info, ('auction_info', 'nodes',)),
+        'scores': (save_scores, ('bids',)),
+    }, timings if timings is not None else {})
+
+
+def _save_scoring(type_: str, timestamp: str, period_start, period_end, results: dict,
+                  overwrite_stake_over: bool = False) -> None:
+    """
+    Creates or updates scoring objects of given type and timestamp for public keys in results in bulk,
+    `overwrite_stake_over` replaces stored stake over flags, so recomputation can clear wrong ones.
+    """
+
+    # Stake over flag set once during the period is never reset
+    stake_overs = set() if overwrite_stake_over else set(models.Scoring.objects.filter(
+        type=type_,
+        timestamp=timestamp,
+        stake_over=True
+    ).values_list('public_key', flat=True))
+
+    scorings, fields = [], {'period_start', 'period_end'}
+
+    for public_key, values in results.items():
+        scoring = models.Scoring(
+            public_key=public_key,
+            type=type_,
+            timestamp=timestamp,
+            period_start=period_start,
+            period_end=period_end,
+            **values
         )
+        if public_key in stake_overs:
+            scoring.stake_over = True
+        scorings.append(scoring)
+        fields.update(values)
+
+    # Insert new scoring objects and update existing ones within a single upsert statement per batch
+    models.Scoring.objects.bulk_create(
+        scorings,
+        batch_size=settings.DB_BATCH_SIZE,
+        update_conflicts=True,
+        unique_fields=['type', 'timestamp', 'public_key'],
+        update_fields=sorted(fields)
+    )
+
+
+def _get_day_range(day) -> (datetime.datetime, datetime.datetime,):
+    """Gets start-end datetimes of given day, so Score rows are selected with an index range scan."""
+
+    start_of_day = timezone.make_aware(datetime.datetime.combine(day, datetime.time.min))
+
+    return start_of_day, start_of_day + datetime.timedelta(days=1)
+
+
+def _aggregate_day_scores(day) -> dict:
+    """Counts all, active and stake over 5 minute intervals of given day for each public key from Score rows."""
+
+    # Closed days may be compacted into rollups, which already hold the counters
+    node_scores = models.ScoreRollup.objects.filter(day=day).exclude(node__public_key='').values(
+        'node_id', 'node__public_key', 'intervals', 'active_intervals', 'stake_over_intervals'
+    )
+
+    # Otherwise count intervals for each node within a single grouped query
+    if not node_scores.exists():
+        start_of_day, end_of_day = _get_day_range(day)
+        node_scores = models.Score.objects.filter(
+            timestamp__gte=start_of_day,
+            timestamp__lt=end_of_day
+        ).exclude(node__public_key='').values(
+            'node_id', 'node__public_key'
+        ).annotate(
+            intervals=Count('id'),
+            active_intervals=Count('id', filter=Q(active=True)),
+            stake_over_intervals=Count('id', filter=Q(percent_of_network__gte=6.0))
+        ).order_by()
+
+    # Public key intervals are the max intervals of its nodes,
+    # while active intervals of all nodes belonging to it are summed up
+    counters = {}
+    for node_score in node_scores:
+        counter = counters.setdefault(
+            node_score['node__public_key'],
+            {'intervals': 0, 'active_intervals': 0, 'stake_over': False}
+        )
+        counter['intervals'] = max(counter['intervals'], node_score['intervals'])
+        counter['active_intervals'] += node_score['active_intervals']
+        counter['stake_over'] = counter['stake_over'] or node_score['stake_over_intervals'] > 0
 
+    return counters
 
-async def calculate_day_scoring():
-    """Calculates current day scores for all public keys present in Database."""
 
-    # Determine current day and previous day as datetime object
-    day_now, previous_day = datetime.datetime.now().date(), datetime.datetime.now().date() - datetime.timedelta(days=1)
+def _save_day_counters(day, counters: dict) -> None:
+    """Replaces running day counters of given day with given counters."""
 
-    print(datetime.datetime.now(), f'Make {day_now} Day Scoring')
+    with transaction.atomic():
+        models.DayCounter.objects.filter(day=day).delete()
+        models.DayCounter.objects.bulk_create(
+            (models.DayCounter(public_key=public_key, day=day, **counter) for public_key, counter in counters.items()),
+            batch_size=settings.DB_BATCH_SIZE
+        )
 
-    # Find max number of 5 minute intervals happened during current day
-    max_scores = max(len(models.Score.objects.filter(node=node, timestamp__date=day_now))
-                     for node in models.Node.objects.exclude(public_key=''))
 
-    print(datetime.datetime.now(), f'Max Scores {max_scores}')
+def _update_day_counters(day, scores: list) -> None:
+    """Updates running day counters of given day with Score objects of a new 5 minute interval."""
 
-    for public_key in set(models.Node.objects.exclude(public_key='').values_list('public_key', flat=True)):
-        # Get all recorded scores that belongs to public key
-        scores = models.Score.objects.filter(node__public_key=public_key, timestamp__date=day_now)
+    # First interval of the day (or first run at all) seeds counters from already saved Score rows
+    if not models.DayCounter.objects.filter(day=day).exists():
+        _save_day_counters(day, _aggregate_day_scores(day))
+        return
+
+    # Collect the new interval increments for each public key
+    increments = {}
+    for score in scores:
+        increment = increments.setdefault(score.node.public_key, {'active_intervals': 0, 'stake_over': False})
+        increment['active_intervals'] += int(score.active)
+        increment['stake_over'] = increment['stake_over'] or score.percent_of_network >= 6.0
+
+    counters = {counter.public_key: counter
+                for counter in models.DayCounter.objects.filter(day=day, public_key__in=increments)}
+    new_counters = []
+
+    for public_key, increment in increments.items():
+        counter = counters.get(public_key)
+        if counter is None:
+            counter = models.DayCounter(public_key=public_key, day=day)
+            new_counters.append(counter)
+
+        counter.intervals += 1
+        counter.active_intervals += increment['active_intervals']
+        counter.stake_over = counter.stake_over or increment['stake_over']
+
+    models.DayCounter.objects.bulk_update(
+        counters.values(),
+        ['intervals', 'active_intervals', 'stake_over'],
+        batch_size=settings.DB_BATCH_SIZE
+    )
+    models.DayCounter.objects.bulk_create(new_counters, batch_size=settings.DB_BATCH_SIZE)
+
+
+def _make_day_scoring(public_keys: set, counters: dict, previous_longevity: dict) -> dict:
+    """Makes day scores and longevity for given public keys from their day counters and previous day longevity."""
+
+    # Find max number of 5 minute intervals happened during the day
+    max_scores = max((counter['intervals'] for counter in counters.values()), default=0)
+
+    if not max_scores:
+        return {}
 
-        # Find how many times the public key was active during current day
-        active_scores = scores.filter(active=True).count()
+    results = {}
 
-        # Calculate public key's score for current day
-        score = (active_scores / max_scores) * 100
+    for public_key in public_keys:
+        counter = counters.get(public_key, {'active_intervals': 0, 'stake_over': False})
 
-        # Check if today was stake over 6% of network weight
-        stake_over = scores.filter(percent_of_network__gte=6.0).exists()
+        # Calculate public key's score for the day
+        score = (counter['active_intervals'] / max_scores) * 100
 
-        # If current day score < 90 at the end of the day, so reset longevity
+        # If the day score < 90 at the end of the day, so reset longevity
         if score < 90 and max_scores == 288:
             longevity = 0
         else:
-            # Try to get previous day longevity, if previous day longevity not found then consider it is 0
-            if models.Scoring.objects.filter(
-                    public_key=public_key,
-                    timestamp=previous_day.strftime('%Y.%m.%d'),
-                    type='D'
-            ).exists():
-                scoring = models.Scoring.objects.get(
-                    public_key=public_key,
-                    timestamp=previous_day.strftime('%Y.%m.%d'),
-                    type='D'
-                )
-                longevity = scoring.longevity
-            else:
-                longevity = 0
-
-            # Update longevity with current day public key's score
-            longevity += score
-
-        # Get or create scoring object for public key, current day and save the following information:
-        # current day score, current day longevity and if public key staked over 6%
-        scoring = models.Scoring.objects.get_or_create(
-            public_key=public_key,
-            timestamp=day_now.strftime('%Y.%m.%d'),
-            type='D'
-        )[0]
-        scoring.score = score
-        scoring.longevity = longevity
-        if stake_over:
-            scoring.stake_over = stake_over
-        scoring.save()
+            # Update previous day longevity with the day public key's score,
+            # if previous day longevity not found then consider it is 0
+            longevity = previous_longevity.get(public_key, 0) + score
+
+        # Save the following information: the day score, the day longevity and if public key staked over 6%
+        results[public_key] = {'score': score, 'longevity': longevity, 'stake_over': counter['stake_over']}
+
+    return results
+
+
+async def calculate_day_scoring(date=None, recompute: bool = False):
+    """Calculates current (or given date) day scores for all public keys present in Database.
+
+    By default scores are derived from running day counters, `recompute` forces
+    a full recomputation from Score rows, which also repairs the counters.
+    """
+
+    # Determine current (or given) day and previous day as date object
+    day_now = (date or datetime.datetime.now()).date()
+    previous_day = day_now - datetime.timedelta(days=1)
+
+    print(datetime.datetime.now(), f'Make {day_now} Day Scoring')
+
+    counters = {}
+    if settings.DAY_SCORING_INCREMENTAL and not recompute:
+        counters = {counter['public_key']: counter for counter in models.DayCounter.objects.filter(
+            day=day_now
+        ).values('public_key', 'intervals', 'active_intervals', 'stake_over')}
+
+    # Recompute counters from Score rows if requested or if they are missing
+    if not counters:
+        counters = _aggregate_day_scores(day_now)
+        _save_day_counters(day_now, counters)
+
+    # Find max number of 5 minute intervals happened during current day
+    max_scores = max((counter['intervals'] for counter in counters.values()), default=0)
+
+    print(datetime.datetime.now(), f'Max Scores {max_scores}')
+
+    if not max_scores:
+        return
+
+    # Get previous day longevity of all public keys at once
+    previous_longevity = dict(models.Scoring.objects.filter(
+        type='D',
+        timestamp=previous_day.strftime('%Y.%m.%d')
+    ).values_list('public_key', 'longevity'))
+
+    results = _make_day_scoring(
+        set(models.Node.objects.exclude(public_key='').values_list('public_key', flat=True)),
+        counters,
+        previous_longevity
+    )
+
+    _save_scoring('D', day_now.strftime('%Y.%m.%d'), day_now, day_now, results)
 
 
 async def _get_week(date):
@@ -303,35 +665,41 @@ async def _get_week(date):
     return start_of_week.date(), end_of_week.date(), week_now
 
 
-async def calculate_week_scoring():
-    """Calculates current week scores for all public keys present in Database."""
+async def calculate_week_scoring(date=None, overwrite_stake_over: bool = False):
+    """Calculates current (or given date) week scores for all public keys present in Database."""
 
-    start_of_week, end_of_week, week_now = await _get_week(datetime.datetime.today())
+    start_of_week, end_of_week, week_now = await _get_week(date or datetime.datetime.today())
 
     print(datetime.datetime.now(), f'Make {week_now} Week Scoring')
 
+    # Select all days of the current week with a single range query
+    days = {}
+    for scoring in models.Scoring.objects.filter(
+            type='D',
+            period_start__range=(start_of_week, end_of_week)
+    ).order_by('period_start', 'id'):
+        days.setdefault(scoring.public_key, []).append(scoring)
+
+    results = {}
+
     for public_key in set(models.Node.objects.exclude(public_key='').values_list('public_key', flat=True)):
         score, stake_over, latest_day, longevity = 0, False, datetime.datetime.min.date(), 0
 
-        # Process each day in the Database for the public key
-        for scoring in models.Scoring.objects.filter(public_key=public_key, type='D'):
-            day = datetime.datetime.strptime(scoring.timestamp, '%Y.%m.%d').date()
+        # Process each day of the current week for the public key
+        for scoring in days.get(public_key, []):
+            # Current week score = sum of all daily scores in this week
+            # Update current week score with day score
+            score += scoring.score
 
-            # Check if day belongs to curren week
-            if start_of_week <= day <= end_of_week:
-                # Current week score = sum of all daily scores in this week
-                # Update current week score with day score
-                score += scoring.score
+            # Check if the public key at least one day staked over 6%
+            if scoring.stake_over:
+                stake_over = True
 
-                # Check if the public key at least one day staked over 6%
-                if scoring.stake_over:
-                    stake_over = True
-
-                # Longevity at the end of the current week = longevity
-                # at the end of the last day of the current week
-                # Find the last day of current week and save its longevity
-                if day > latest_day:
-                    latest_day, longevity = day, scoring.longevity
+            # Longevity at the end of the current week = longevity
+            # at the end of the last day of the current week
+            # Find the last day of current week and save its longevity
+            if scoring.period_start > latest_day:
+                latest_day, longevity = scoring.period_start, scoring.longevity
 
         score /= 7
 
@@ -340,99 +708,536 @@ async def calculate_week_scoring():
             score *= 0.9
 
         # Save current week scoring for each public key
-        scoring = models.Scoring.objects.get_or_create(public_key=public_key, timestamp=week_now, type='W')[0]
-        scoring.longevity = longevity
-        scoring.score = score
-        if stake_over:
-            scoring.stake_over = stake_over
-        scoring.save()
+        results[public_key] = {'score': score, 'longevity': longevity, 'stake_over': stake_over}
 
+    _save_scoring('W', week_now, start_of_week, end_of_week, results, overwrite_stake_over)
 
-async def determine_eligible_rewards():
-    """Determines what public keys (100) are eligible for rewards at the current week"""
 
-    *_, week_now = await _get_week(datetime.datetime.today())
+async def determine_eligible_rewards(date=None):
+    """Determines what public keys (100 by default) are eligible for rewards at the current (or given date) week"""
+
+    start_of_week, end_of_week, week_now = await _get_week(date or datetime.datetime.today())
 
     print(datetime.datetime.now(), f'Determine {week_now} Week Eligible for Rewards')
 
     # Filter current week scoring and sort it in descending order by score then by longevity
-    week_scoring_sorted = models.Scoring.objects.filter(type='W', timestamp=week_now).order_by('-score', '-longevity')
+    week_scoring = models.Scoring.objects.filter(type='W', timestamp=week_now)
+    ranking = week_scoring.order_by('-score', '-longevity', 'id')
+    eligible = ranking.values('id')[:settings.ELIGIBLE_FOR_REWARDS_LIMIT]
 
     # Mark first 100 as eligible for rewards, others not
-    for index, scoring in enumerate(week_scoring_sorted):
-        scoring.eligible_for_rewards = True if index < 100 else False
-        scoring.save()
+    with transaction.atomic():
+        week_scoring.filter(id__in=eligible).update(eligible_for_rewards=True)
+        week_scoring.exclude(id__in=eligible).update(eligible_for_rewards=False)
+
+        _save_leaderboard(week_now, start_of_week, end_of_week,
+                          list(ranking.values_list('public_key', 'score', 'longevity')))
+
+
+def _save_leaderboard(week: str, period_start, period_end, ranking: list) -> None:
+    """Replaces leaderboard snapshot of given week with ranking of (public key, score, longevity) best first."""
+
+    models.Leaderboard.objects.filter(week=week).delete()
+    models.Leaderboard.objects.bulk_create(
+        (
+            models.Leaderboard(
+                week=week,
+                period_start=period_start,
+                period_end=period_end,
+                public_key=public_key,
+                rank=rank,
+                score=score,
+                longevity=longevity,
+                eligible_for_rewards=rank <= settings.ELIGIBLE_FOR_REWARDS_LIMIT
+            )
+            for rank, (public_key, score, longevity) in enumerate(ranking, start=1)
+        ),
+        batch_size=settings.DB_BATCH_SIZE
+    )
 
 
-async def calculate_quarter_rewards():
-    """Calculates current quarter rewards for all public keys present in Database."""
+async def _get_quarter(date):
+    """Gets start-end quarter dates for given date."""
 
-    # Get current quarter start-end dates as datetime object
-    today = datetime.date.today()
-    quarter = (today.month - 1) // 3 + 1
+    quarter = (date.month - 1) // 3 + 1
     match quarter:
         case 1:
-            start_of_quarter, end_of_quarter = datetime.date(today.year, 1, 1), datetime.date(today.year, 3, 31)
+            start_of_quarter, end_of_quarter = datetime.date(date.year, 1, 1), datetime.date(date.year, 3, 31)
         case 2:
-            start_of_quarter, end_of_quarter = datetime.date(today.year, 4, 1), datetime.date(today.year, 6, 30)
+            start_of_quarter, end_of_quarter = datetime.date(date.year, 4, 1), datetime.date(date.year, 6, 30)
         case 3:
-            start_of_quarter, end_of_quarter = datetime.date(today.year, 7, 1), datetime.date(today.year, 9, 30)
+            start_of_quarter, end_of_quarter = datetime.date(date.year, 7, 1), datetime.date(date.year, 9, 30)
         case 4:
-            start_of_quarter, end_of_quarter = datetime.date(today.year, 10, 1), datetime.date(today.year, 12, 31)
+            start_of_quarter, end_of_quarter = datetime.date(date.year, 10, 1), datetime.date(date.year, 12, 31)
     quarter_now = f"Q{quarter}: {start_of_quarter.strftime('%Y.%m.%d')} - {end_of_quarter.strftime('%Y.%m.%d')}"
 
+    return start_of_quarter, end_of_quarter, quarter_now
+
+
+async def calculate_quarter_rewards(date=None, overwrite_stake_over: bool = False):
+    """Calculates current (or given date) quarter rewards for all public keys present in Database."""
+
+    # Get current quarter start-end dates as datetime object
+    start_of_quarter, end_of_quarter, quarter_now = await _get_quarter(date or datetime.date.today())
+
     print(datetime.datetime.now(), f'Make {quarter_now} Quarter Scoring')
 
+    weeks = models.Scoring.objects.filter(type='W', period_start__range=(start_of_quarter, end_of_quarter))
+
+    # Roll up all weeks of the current quarter for each public key within a single grouped query:
+    # total quarter rewards = sum of week rewards in which public key is eligible for rewards,
+    # stake over if at least one week staked over 6% and longevity at the end of the latest week
+    quarter_scores = {quarter_score['public_key']: quarter_score for quarter_score in weeks.values(
+        'public_key'
+    ).annotate(
+        eligible_score=Sum('score', filter=Q(eligible_for_rewards=True), default=0.0),
+        stake_over_weeks=Count('id', filter=Q(stake_over=True)),
+        latest_longevity=Subquery(weeks.filter(
+            public_key=OuterRef('public_key')
+        ).order_by('-period_start').values('longevity')[:1])
+    ).order_by()}
+
+    results = {}
+
     for public_key in set(models.Node.objects.exclude(public_key='').values_list('public_key', flat=True)):
-        score, stake_over, latest_week, longevity = 0, False, datetime.datetime.min.date(), 0
+        quarter_score = quarter_scores.get(public_key)
+        if quarter_score is None:
+            score, stake_over, longevity = 0, False, 0
+        else:
+            score, stake_over, longevity = (quarter_score['eligible_score'], quarter_score['stake_over_weeks'] > 0,
+                                            quarter_score['latest_longevity'])
 
-        # Process each week in the Database for the public key
-        for scoring in models.Scoring.objects.filter(public_key=public_key, type='W'):
-            # Get week start-end dates as datetime object
-            start_of_week, end_of_week = (part.strip() for part in scoring.timestamp.split(':')[-1].split('-'))
-            start_of_week, end_of_week = (datetime.datetime.strptime(start_of_week, '%Y.%m.%d').date(),
-                                          datetime.datetime.strptime(end_of_week, '%Y.%m.%d').date())
+        # Save current quarter rewards for each public key
+        results[public_key] = {
+            'score': score,
+            'longevity': longevity,
+            'stake_over': stake_over,
+            'eligible_for_rewards': True if score else False
+        }
 
-            # Check if week belongs to current quarter
-            if start_of_quarter <= start_of_week <= end_of_quarter:
-                # Update total quarter rewards with week rewards if public key is eligible for rewards in the week
-                if scoring.eligible_for_rewards:
-                    score += scoring.score
+    _save_scoring('Q', quarter_now, start_of_quarter, end_of_quarter, results, overwrite_stake_over)
 
-                if scoring.stake_over:
-                    stake_over = True
 
-                if start_of_week > latest_week:
-                    latest_week, longevity = start_of_week, scoring.longevity
+async def recompute_scoring(start_day, end_day, workers: int = None) -> None:
+    """Recomputes day, week, eligible for rewards and quarter scoring for given range of days from stored scores."""
 
-        # Save current quarter rewards for each public key
-        scoring = models.Scoring.objects.get_or_create(public_key=public_key, timestamp=quarter_now, type='Q')[0]
-        scoring.longevity = longevity
-        scoring.score = score
-        if stake_over:
-            scoring.stake_over = stake_over
-        scoring.eligible_for_rewards = True if score else False
-        scoring.save()
+    days = [start_day + datetime.timedelta(days=offset) for offset in range((end_day - start_day).days + 1)]
+
+    print(datetime.datetime.now(), f'Recompute Scoring From {start_day} To {end_day}')
+
+    # Counting intervals of each day is independent, so days are spread across process pool,
+    # connections are closed before forking, so each worker opens its own one
+    connections.close_all()
+    loop = asyncio.get_running_loop()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        days_counters = await asyncio.gather(*(
+            loop.run_in_executor(pool, _aggregate_day_scores, day) for day in days
+        ))
+
+    print(datetime.datetime.now(), f'Counted {len(days)} Days')
+
+    public_keys = set(models.Node.objects.exclude(public_key='').values_list('public_key', flat=True))
+
+    # Longevity is chained day by day starting from the day before the range
+    previous_longevity = dict(models.Scoring.objects.filter(
+        type='D',
+        timestamp=(start_day - datetime.timedelta(days=1)).strftime('%Y.%m.%d')
+    ).values_list('public_key', 'longevity'))
+
+    for day, counters in zip(days, days_counters):
+        _save_day_counters(day, counters)
+
+        results = _make_day_scoring(public_keys, counters, previous_longevity)
+        if results:
+            # Stake over flags are recomputed from scratch, so wrong stored ones are cleared
+            _save_scoring('D', day.strftime('%Y.%m.%d'), day, day, results, overwrite_stake_over=True)
+
+        previous_longevity = {public_key: result['longevity'] for public_key, result in results.items()}
+
+    # Weeks and quarters are recomputed once, using the last day of the range belonging to them
+    weeks, quarters = {}, {}
+    for day in days:
+        *_, week = await _get_week(datetime.datetime.combine(day, datetime.time.min))
+        *_, quarter = await _get_quarter(day)
+        weeks[week], quarters[quarter] = day, day
+
+    for week, day in weeks.items():
+        await calculate_week_scoring(datetime.datetime.combine(day, datetime.time.min), overwrite_stake_over=True)
+        await determine_eligible_rewards(datetime.datetime.combine(day, datetime.time.min))
+
+    for quarter, day in quarters.items():
+        await calculate_quarter_rewards(day, overwrite_stake_over=True)
+
+    print(datetime.datetime.now(), f'Recomputed {len(days)} Days, {len(weeks)} Weeks, {len(quarters)} Quarters')
+
+
+def _rollup_day(day) -> int:
+    """Compacts Score rows of given closed day into one rollup object per node."""
+
+    start_of_day, end_of_day = _get_day_range(day)
+
+    rollups = {}
+    for score in models.Score.objects.filter(
+            timestamp__gte=start_of_day,
+            timestamp__lt=end_of_day
+    ).order_by('timestamp').values(
+        'node_id', 'timestamp', 'active', 'current_block', 'network_weight', 'total_stake', 'active_bid',
+        'percent_of_network'
+    ).iterator(chunk_size=settings.DB_BATCH_SIZE):
+        rollup = rollups.setdefault(score['node_id'], models.ScoreRollup(node_id=score['node_id'], day=day))
+        rollup.add_score(score)
+
+    for rollup in rollups.values():
+        rollup.recorded_slots, rollup.active_slots = bytes(rollup.recorded_slots), bytes(rollup.active_slots)
+
+    with transaction.atomic():
+        models.ScoreRollup.objects.filter(day=day).delete()
+        models.ScoreRollup.objects.bulk_create(rollups.values(), batch_size=settings.DB_BATCH_SIZE)
+
+    return len(rollups)
+
+
+async def rollup_scores():
+    """Compacts Score rows of closed days and purges the ones older than retention window."""
+
+    today = datetime.datetime.now().date()
+
+    first_score = models.Score.objects.aggregate(first=Min('timestamp'))['first']
+    if first_score is None:
+        return
+
+    # Roll up every closed day which still has Score rows, but no rollups yet
+    day = timezone.localtime(first_score).date()
+    rolled_up = set(models.ScoreRollup.objects.filter(day__gte=day).values_list('day', flat=True).distinct())
+
+    while day < today:
+        if day not in rolled_up:
+            print(datetime.datetime.now(), f'Rolled Up {day} Day, {_rollup_day(day)} Nodes')
+        day += datetime.timedelta(days=1)
+
+    # Purge Score rows of compacted days older than retention window
+    retention_start, _ = _get_day_range(today - datetime.timedelta(days=max(settings.SCORE_RETENTION_DAYS, 1)))
+    deleted, _ = models.Score.objects.filter(timestamp__lt=retention_start).delete()
+
+    print(datetime.datetime.now(), f'Purged {deleted} Scores Older Than {retention_start.date()}')
+
+
+def _save_cycle(started: datetime.datetime, status: str, timings: dict = None, note: str = '') -> None:
+    """Records the monitoring cycle of the current interval with its status and stage timings."""
+
+    try:
+        # Note is usually an error message, which may be longer than its field on Postgres
+        models.Cycle.objects.create(started=started, status=status, timings=timings or {},
+                                    note=note[:models.Cycle._meta.get_field('note').max_length])
+    except Exception as error:
+        print(datetime.datetime.now(), f'Cycle Is Not Recorded: {error}')
+
+
+def _acquire_cycle_lease(token: str):
+    """Acquires the cycle lease, returns None if Redis is not available, so the cycle runs without it."""
+
+    try:
+        return cache.acquire_cycle_lease(token)
+    except Exception as error:
+        print(datetime.datetime.now(), f'Cycle Lease Is Not Available: {error}')
+        return None
+
+
+def _release_cycle_lease(token: str) -> None:
+    """Releases the cycle lease held by given token."""
+
+    try:
+        cache.release_cycle_lease(token)
+    except Exception as error:
+        print(datetime.datetime.now(), f'Cycle Lease Is Not Released: {error}')
 
 
 async def main():
     print(datetime.datetime.now())
 
-    start_time = time.time()
+    started, token = timezone.now(), uuid.uuid4().hex
+
+    # Only one cycle runs at a time, the lease expires by itself if the worker running it dies
+    leased = _acquire_cycle_lease(token)
+
+    if leased is False:
+        print(datetime.datetime.now(), 'Previous Cycle Is Still Running, Interval Skipped', '\n')
+        _save_cycle(started, 'S', note='Previous cycle is still running')
+        return
+
+    try:
+        await run_cycle(started)
+    except BaseException as error:
+        _save_cycle(started, 'F', note=str(error).strip() or error.__class__.__name__)
+        raise
+    finally:
+        if leased:
+            _release_cycle_lease(token)
+
+
+async def run_cycle(started: datetime.datetime) -> None:
+    """Records scores of the current interval and updates scoring, scoring is skipped if the cycle is late."""
+
+    start_time, timings = time.time(), {}
+
+    # Share one pooled HTTP session between all requests of the cycle
+    async with get_session() as session:
+        await monitoring_score(session, timings, deadline=start_time + settings.CYCLE_POLL_DEADLINE)
+
+    await update_scoring(started, start_time, timings)
+
+
+async def update_scoring(started: datetime.datetime, start_time: float, timings: dict, note: str = '') -> None:
+    """Updates scoring once the interval is recorded and records the cycle, scoring is skipped if the cycle is late."""
+
+    # Interval is recorded even if polling hit its deadline, so the cycle is only marked as late
+    late, skipped = time.time() >= start_time + settings.CYCLE_POLL_DEADLINE, []
+
+    # Select engine which makes day, week, eligible for rewards and quarter scoring
+    if settings.SCORING_ENGINE == 'vectorized':
+        steps = (vectorized.calculate_day_scoring, vectorized.calculate_week_scoring,
+                 vectorized.determine_eligible_rewards, vectorized.calculate_quarter_rewards)
+    else:
+        steps = (calculate_day_scoring, calculate_week_scoring, determine_eligible_rewards, calculate_quarter_rewards)
+
+    # Periods are taken from the interval start, so the last cycle of a day, week or quarter
+    # still finalizes it when scoring runs after midnight
+    date = timezone.make_naive(started)
 
-    await monitoring_score()
+    # Each step reads scoring written by the previous one, so they are run one after another
+    # Late cycle leaves scoring to the next one, which catches up from day counters
+    for step in steps:
+        if time.time() > start_time + settings.CYCLE_DEADLINE:
+            print(datetime.datetime.now(), f'Cycle Deadline Exceeded, {step.__name__} Skipped')
+            skipped.append(step.__name__)
+            continue
 
-    await calculate_day_scoring()
+        with stage(timings, step.__name__):
+            await step(date)
 
-    await calculate_week_scoring()
+    # Invalidate cached API responses, as scoring has been changed
+    try:
+        cache.bump_cycle_version()
+    except Exception as error:
+        print(datetime.datetime.now(), f'Cache Is Not Invalidated: {error}')
 
-    await determine_eligible_rewards()
+    stage_timings = ', '.join(f'{name} {duration:.2f}s' for name, duration in timings.items())
+    print(datetime.datetime.now(), 'Stage Timings', stage_timings)
 
-    await calculate_quarter_rewards()
+    # Cycle is late if polling hit its deadline, any scoring step is skipped or some results are missing
+    if late or skipped or note:
+        notes = [note] if note else []
+        if skipped:
+            notes.append(f"Skipped {', '.join(skipped)}")
+        _save_cycle(started, 'L', timings, note='; '.join(notes) or 'Deadline exceeded')
+    else:
+        _save_cycle(started, 'C', timings)
 
     print(datetime.datetime.now(), time.time() - start_time, '\n')
 
 
+def _reduce_status(resp: dict) -> dict:
+    """Keeps only status response fields used by monitoring, so shard results passed between workers stay small."""
+
+    if 'error' in resp:
+        return {'error': resp['error']}
+
+    reduced = {key: resp[key] for key in ('our_public_signing_key', 'last_added_block_info') if key in resp}
+    if 'peers' in resp:
+        reduced['peers'] = [{'address': peer['address']} for peer in resp['peers']]
+
+    return reduced
+
+
+def _reduce_auction_info(auction_info: dict) -> dict:
+    """Keeps only auction info fields used by monitoring, delegators of each bid are summed up."""
+
+    if not auction_info:
+        return {}
+
+    auction_state = auction_info['result']['auction_state']
+
+    return {'result': {'auction_state': {
+        'era_validators': [{'validator_weights': [
+            {'public_key': validator['public_key'], 'weight': validator['weight']}
+            for validator in auction_state['era_validators'][0]['validator_weights']
+        ]}],
+        'bids': [
+            {'public_key': bid['public_key'], 'bid': {
+                'inactive': bid['bid']['inactive'],
+                'staked_amount': bid['bid']['staked_amount'],
+                'delegators': [{'staked_amount': str(sum(int(delegator['staked_amount'])
+                                                         for delegator in bid['bid']['delegators']))}]
+            }}
+            for bid in auction_state['bids']
+        ]
+    }}}
+
+
+async def start_sharded_cycle() -> dict:
+    """Takes the cycle lease and splits IP addresses due to be polled into consistent hash shards."""
+
+    print(datetime.datetime.now())
+
+    start_time, token = time.time(), uuid.uuid4().hex
+
+    if _acquire_cycle_lease(token) is False:
+        print(datetime.datetime.now(), 'Previous Cycle Is Still Running, Interval Skipped', '\n')
+        _save_cycle(timezone.now(), 'S', note='Previous cycle is still running')
+        return {}
+
+    try:
+        async with get_session() as session:
+            peers = await load_peers(session)
+    except BaseException as error:
+        _save_cycle(timezone.now(), 'F', note=str(error).strip() or error.__class__.__name__)
+        _release_cycle_lease(token)
+        raise
+
+    return {
+        'token': token,
+        'start_time': start_time,
+        'deadline': start_time + settings.CYCLE_POLL_DEADLINE,
+        'shards': sharding.split(peers, settings.STATUS_SHARDS),
+        'peers_duration': time.time() - start_time
+    }
+
+
+async def poll_shard(peers: dict, deadline: float) -> dict:
+    """Polls statuses of one shard of IP addresses until the poll deadline."""
+
+    start_time = time.time()
+
+    # Shard which failed is reported as not polled, so the interval is still written
+    try:
+        async with get_session() as session:
+            responses = await poll_statuses(session, peers, deadline)
+    except Exception as error:
+        print(datetime.datetime.now(), f'Shard Is Not Polled: {error}')
+        responses = []
+
+    return {
+        'responses': [(ip, _reduce_status(resp), latency) for ip, resp, latency in responses],
+        'duration': time.time() - start_time
+    }
+
+
+async def poll_auction_info(deadline: float) -> dict:
+    """Gets auction info until the poll deadline alongside status shards."""
+
+    start_time = time.time()
+
+    try:
+        async with get_session() as session:
+            auction_info = _reduce_auction_info(await fetch_auction_info(session, deadline))
+    except Exception as error:
+        print(datetime.datetime.now(), f'Auction Info Is Not Fetched: {error}')
+        auction_info = {}
+
+    return {'auction_info': auction_info, 'duration': time.time() - start_time}
+
+
+def _close_cycle(token: str) -> bool:
+    """Closes the sharded cycle of given token, so it is recorded either by its callback or by its fallback."""
+
+    # Cycle is closed by whoever comes first, if Redis is not available both of them may record it
+    try:
+        return cache.close_cycle(token)
+    except Exception as error:
+        print(datetime.datetime.now(), f'Cycle Is Not Closed: {error}')
+        return True
+
+
+def is_sharded_cycle_closed(token: str) -> bool:
+    """Checks if the sharded cycle of given token has been recorded by its callback or by its fallback already."""
+
+    try:
+        return cache.is_cycle_closed(token)
+    except Exception as error:
+        print(datetime.datetime.now(), f'Cycle Is Not Checked: {error}')
+        return False
+
+
+def abort_sharded_cycle(token: str, start_time: float, note: str) -> None:
+    """Records the sharded cycle as failed and releases its lease, unless its callback has already taken it over."""
+
+    if not _close_cycle(token):
+        return
+
+    print(datetime.datetime.now(), f'Cycle Is Aborted: {note}', '\n')
+
+    _save_cycle(datetime.datetime.fromtimestamp(start_time, tz=datetime.timezone.utc), 'F', note=note)
+    _release_cycle_lease(token)
+
+
+async def finish_sharded_cycle(results: list, token: str, start_time: float, peers_duration: float = 0,
+                               note: str = '') -> None:
+    """Writes the interval from auction info and all shard statuses, then updates scoring and releases the lease."""
+
+    started = datetime.datetime.fromtimestamp(start_time, tz=datetime.timezone.utc)
+
+    # Cycle which has been aborted already is not written, its lease may be held by the next one
+    if not _close_cycle(token):
+        print(datetime.datetime.now(), 'Cycle Is Already Aborted, Shards Dropped', '\n')
+        return
+
+    try:
+        auction, *shards = results
+
+        # Auction info which is not reported is treated as not fetched, nodes of missing shards as not polled
+        missing = sum(shard is None for shard in shards)
+        notes = [note] if note else []
+        if auction is None:
+            notes.append('Auction info is not reported')
+        if missing:
+            notes.append(f'{missing} of {len(shards)} shards are not reported')
+
+        auction = auction or {'auction_info': {}, 'duration': 0}
+        shards = [shard or {'responses': [], 'duration': 0} for shard in shards]
+
+        # Shards are polled in parallel, so polling takes as long as the slowest shard
+        timings = {
+            'peers': peers_duration,
+            'auction_info': auction['duration'],
+            'statuses': max((shard['duration'] for shard in shards), default=0)
+        }
+
+        print(datetime.datetime.now(), f'Got {len(shards)} Shards')
+
+        with stage(timings, 'nodes'):
+            nodes = await update_nodes([response for shard in shards for response in shard['responses']])
+
+        with stage(timings, 'bids'):
+            nodes = await update_auction_info(auction['auction_info'], nodes)
+
+        # Max height is taken over nodes of all shards
+        with stage(timings, 'scores'):
+            await save_scores(nodes)
+
+        await update_scoring(started, start_time, timings, note='; '.join(notes))
+    except BaseException as error:
+        _save_cycle(started, 'F', note=str(error).strip() or error.__class__.__name__)
+        raise
+    finally:
+        _release_cycle_lease(token)
+
+
+async def recover_sharded_cycle(results: list, token: str, start_time: float, peers_duration: float,
+                                note: str) -> None:
+    """
+    Writes the interval from results reported before a shard failed or the deadline passed,
+    missing ones are given as None, the cycle is aborted only if nothing is reported.
+    """
+
+    if all(result is None for result in results):
+        abort_sharded_cycle(token, start_time, note)
+        return
+
+    print(datetime.datetime.now(), f'Cycle Is Recovered: {note}')
+
+    await finish_sharded_cycle(results, token, start_time, peers_duration, note)
+
+
 # if __name__ == '__main__':
 #     asyncio.run(main())
 #
@@ -0,0 +1,41 @@
+import bisect
+import functools
+import hashlib
+
+
+# Points per shard on the hash ring, more points spread IP addresses between shards more evenly
+VIRTUAL_NODES = 64
+
+
+def _get_hash(value: str) -> int:
+    """Gets stable 64-bit hash of given string, unlike built-in hash it is the same in every worker process."""
+
+    return int.from_bytes(hashlib.md5(value.encode()).digest()[:8], 'big')
+
+
+@functools.lru_cache()
+def _get_ring(shards: int) -> (list, list,):
+    """Gets sorted hash ring points and shard owning each of them."""
+
+    points = sorted((_get_hash(f'{shard}:{point}'), shard) for shard in range(shards) for point in range(VIRTUAL_NODES))
+
+    return [point[0] for point in points], [point[1] for point in points]
+
+
+def get_shard(ip: str, shards: int) -> int:
+    """Gets shard of given IP address, changing number of shards moves only a part of IP addresses between them."""
+
+    hashes, owners = _get_ring(shards)
+
+    return owners[bisect.bisect(hashes, _get_hash(ip)) % len(hashes)]
+
+
+def split(peers: dict, shards: int) -> list:
+    """Splits IP addresses with their status request timeouts into given number of consistent hash shards."""
+
+    partition = [{} for _ in range(shards)]
+
+    for ip, timeout in peers.items():
+        partition[get_shard(ip, shards)][ip] = timeout
+
+    return partition
@@ -0,0 +1,239 @@
+import datetime
+import numpy as np
+
+from django.conf import settings
+from django.db import transaction
+from src.casper import services
+from src.core import models
+
+
+def _get_public_keys() -> np.ndarray:
+    """Gets sorted array of all public keys present in Database."""
+
+    return np.array(
+        sorted(set(models.Node.objects.exclude(public_key='').values_list('public_key', flat=True))),
+        dtype=object
+    )
+
+
+def _get_key_index(public_keys: np.ndarray, keys) -> (np.ndarray, np.ndarray,):
+    """Gets index of each key in sorted public keys array and mask of keys which are present there."""
+
+    keys = np.array(list(keys), dtype=object)
+    if not public_keys.size:
+        return np.zeros(keys.size, dtype=np.int64), np.zeros(keys.size, dtype=bool)
+
+    index = np.minimum(np.searchsorted(public_keys, keys), public_keys.size - 1)
+
+    return index, public_keys[index] == keys
+
+
+def _get_latest(size: int, index: np.ndarray, values: np.ndarray) -> np.ndarray:
+    """Gets the last value for each index of values sorted by date, zero if index has no values."""
+
+    latest = np.zeros(size, dtype=np.float64)
+
+    # Position of the last occurrence of each index
+    unique_index, reversed_position = np.unique(index[::-1], return_index=True)
+    latest[unique_index] = values[index.size - 1 - reversed_position]
+
+    return latest
+
+
+def _get_activity_matrix(day) -> (np.ndarray, np.ndarray, np.ndarray, np.ndarray,):
+    """Loads Score rows of given day as nodes x intervals matrices of recorded, active and stake over counts."""
+
+    start_of_day, end_of_day = services._get_day_range(day)
+
+    rows = list(models.Score.objects.filter(
+        timestamp__gte=start_of_day,
+        timestamp__lt=end_of_day
+    ).exclude(node__public_key='').values_list('node_id', 'node__public_key', 'timestamp', 'active',
+                                               'percent_of_network'))
+
+    node_ids, node_index = np.unique(np.array([row[0] for row in rows], dtype=np.int64), return_inverse=True)
+
+    # Slot is the index of 5 minute interval in the day
+    seconds = np.array([(row[2] - start_of_day).total_seconds() for row in rows], dtype=np.float64)
+    slots = np.minimum(seconds // models.ScoreRollup.INTERVAL.total_seconds(),
+                       models.ScoreRollup.SLOTS - 1).astype(np.int64)
+
+    recorded = np.zeros((node_ids.size, models.ScoreRollup.SLOTS), dtype=np.int32)
+    active = np.zeros_like(recorded)
+    stake_over = np.zeros_like(recorded)
+
+    np.add.at(recorded, (node_index, slots), 1)
+    np.add.at(active, (node_index, slots), np.array([row[3] for row in rows], dtype=np.int32))
+    np.add.at(stake_over, (node_index, slots), np.array([row[4] >= 6.0 for row in rows], dtype=np.int32))
+
+    # Public key of each node in the matrices
+    node_keys = np.empty(node_ids.size, dtype=object)
+    node_keys[node_index] = [row[1] for row in rows]
+
+    return node_keys, recorded, active, stake_over
+
+
+async def calculate_day_scoring(date=None):
+    """Calculates current (or given date) day scores for all public keys with vectorized operations."""
+
+    # Determine current (or given) day and previous day as date object
+    day_now = (date or datetime.datetime.now()).date()
+    previous_day = day_now - datetime.timedelta(days=1)
+
+    print(datetime.datetime.now(), f'Make {day_now} Day Scoring (Vectorized)')
+
+    public_keys = _get_public_keys()
+
+    # Closed days may be compacted into rollups, which already hold the counters per node
+    rollups = list(models.ScoreRollup.objects.filter(day=day_now).exclude(node__public_key='').values_list(
+        'node__public_key', 'intervals', 'active_intervals', 'stake_over_intervals'
+    ))
+    if rollups:
+        node_keys = np.array([rollup[0] for rollup in rollups], dtype=object)
+        node_intervals, node_active, node_stake_over = (np.array([rollup[column] for rollup in rollups],
+                                                                 dtype=np.int64) for column in (1, 2, 3))
+    else:
+        node_keys, recorded, active, stake_over = _get_activity_matrix(day_now)
+        node_intervals, node_active, node_stake_over = recorded.sum(axis=1), active.sum(axis=1), stake_over.sum(axis=1)
+
+    # Public key intervals are the max intervals of its nodes,
+    # while active intervals of all nodes belonging to it are summed up
+    key_index, present = _get_key_index(public_keys, node_keys)
+    intervals = np.zeros(public_keys.size, dtype=np.int64)
+    active_scores = np.zeros(public_keys.size, dtype=np.int64)
+    stake_overs = np.zeros(public_keys.size, dtype=np.int64)
+    np.maximum.at(intervals, key_index[present], node_intervals[present])
+    np.add.at(active_scores, key_index[present], node_active[present])
+    np.add.at(stake_overs, key_index[present], node_stake_over[present])
+
+    # Find max number of 5 minute intervals happened during current day
+    max_scores = int(intervals.max()) if intervals.size else 0
+
+    print(datetime.datetime.now(), f'Max Scores {max_scores}')
+
+    if not max_scores:
+        return
+
+    # Get previous day longevity of all public keys at once
+    previous = list(models.Scoring.objects.filter(
+        type='D',
+        timestamp=previous_day.strftime('%Y.%m.%d')
+    ).values_list('public_key', 'longevity'))
+    previous_index, previous_present = _get_key_index(public_keys, [scoring[0] for scoring in previous])
+    previous_longevity = np.zeros(public_keys.size, dtype=np.float64)
+    previous_longevity[previous_index[previous_present]] = np.array(
+        [scoring[1] for scoring in previous], dtype=np.float64
+    )[previous_present]
+
+    # Calculate scores and longevity of all public keys,
+    # longevity is reset if current day score < 90 at the end of the day
+    scores = (active_scores / max_scores) * 100
+    longevity = np.where((scores < 90) & (max_scores == 288), 0.0, previous_longevity + scores)
+
+    services._save_scoring('D', day_now.strftime('%Y.%m.%d'), day_now, day_now, {
+        public_key: {'score': float(score), 'longevity': float(longevity), 'stake_over': bool(stake_over)}
+        for public_key, score, longevity, stake_over in zip(public_keys, scores, longevity, stake_overs > 0)
+    })
+
+
+async def calculate_week_scoring(date=None):
+    """Calculates current (or given date) week scores for all public keys with vectorized operations."""
+
+    start_of_week, end_of_week, week_now = await services._get_week(date or datetime.datetime.today())
+
+    print(datetime.datetime.now(), f'Make {week_now} Week Scoring (Vectorized)')
+
+    public_keys = _get_public_keys()
+
+    days = list(models.Scoring.objects.filter(
+        type='D',
+        period_start__range=(start_of_week, end_of_week)
+    ).order_by('period_start', 'id').values_list('public_key', 'score', 'stake_over', 'longevity'))
+    key_index, present = _get_key_index(public_keys, [scoring[0] for scoring in days])
+    key_index = key_index[present]
+    day_scores, day_stake_overs, day_longevity = (np.array([scoring[column] for scoring in days],
+                                                           dtype=np.float64)[present] for column in (1, 2, 3))
+
+    # Current week score = sum of all daily scores in this week divided by 7,
+    # decreased by 10% if the public key at least one day staked over 6%
+    scores = np.zeros(public_keys.size, dtype=np.float64)
+    stake_overs = np.zeros(public_keys.size, dtype=np.float64)
+    np.add.at(scores, key_index, day_scores)
+    np.add.at(stake_overs, key_index, day_stake_overs)
+    scores /= 7
+    scores = np.where(stake_overs > 0, scores * 0.9, scores)
+
+    # Longevity at the end of the current week = longevity at the end of the last day of the current week
+    longevity = _get_latest(public_keys.size, key_index, day_longevity)
+
+    services._save_scoring('W', week_now, start_of_week, end_of_week, {
+        public_key: {'score': float(score), 'longevity': float(longevity), 'stake_over': bool(stake_over)}
+        for public_key, score, longevity, stake_over in zip(public_keys, scores, longevity, stake_overs > 0)
+    })
+
+
+async def determine_eligible_rewards(date=None):
+    """Determines public keys eligible for rewards at the current (or given date) week with vectorized ranking."""
+
+    start_of_week, end_of_week, week_now = await services._get_week(date or datetime.datetime.today())
+
+    print(datetime.datetime.now(), f'Determine {week_now} Week Eligible for Rewards (Vectorized)')
+
+    week_scoring = models.Scoring.objects.filter(type='W', timestamp=week_now)
+
+    weeks = list(week_scoring.values_list('id', 'score', 'longevity', 'public_key'))
+    ids = np.array([scoring[0] for scoring in weeks], dtype=np.int64)
+    scores = np.array([scoring[1] for scoring in weeks], dtype=np.float64)
+    longevity = np.array([scoring[2] for scoring in weeks], dtype=np.float64)
+
+    # Sort in descending order by score then by longevity, ties are broken by id
+    ranking = np.lexsort((ids, -longevity, -scores))
+    eligible = ids[ranking[:settings.ELIGIBLE_FOR_REWARDS_LIMIT]].tolist()
+
+    with transaction.atomic():
+        week_scoring.filter(id__in=eligible).update(eligible_for_rewards=True)
+        week_scoring.exclude(id__in=eligible).update(eligible_for_rewards=False)
+
+        services._save_leaderboard(week_now, start_of_week, end_of_week, [
+            (weeks[position][3], weeks[position][1], weeks[position][2]) for position in ranking
+        ])
+
+
+async def calculate_quarter_rewards(date=None):
+    """Calculates current (or given date) quarter rewards for all public keys with vectorized operations."""
+
+    start_of_quarter, end_of_quarter, quarter_now = await services._get_quarter(date or datetime.date.today())
+
+    print(datetime.datetime.now(), f'Make {quarter_now} Quarter Scoring (Vectorized)')
+
+    public_keys = _get_public_keys()
+
+    weeks = list(models.Scoring.objects.filter(
+        type='W',
+        period_start__range=(start_of_quarter, end_of_quarter)
+    ).order_by('period_start', 'id').values_list('public_key', 'score', 'eligible_for_rewards', 'stake_over',
+                                                 'longevity'))
+    key_index, present = _get_key_index(public_keys, [scoring[0] for scoring in weeks])
+    key_index = key_index[present]
+    week_scores, week_eligible, week_stake_overs, week_longevity = (
+        np.array([scoring[column] for scoring in weeks], dtype=np.float64)[present] for column in (1, 2, 3, 4)
+    )
+
+    # Total quarter rewards = sum of week rewards in which public key is eligible for rewards
+    scores = np.zeros(public_keys.size, dtype=np.float64)
+    stake_overs = np.zeros(public_keys.size, dtype=np.float64)
+    np.add.at(scores, key_index, week_scores * week_eligible)
+    np.add.at(stake_overs, key_index, week_stake_overs)
+
+    # Longevity at the end of the latest week
+    longevity = _get_latest(public_keys.size, key_index, week_longevity)
+
+    services._save_scoring('Q', quarter_now, start_of_quarter, end_of_quarter, {
+        public_key: {
+            'score': float(score),
+            'longevity': float(longevity),
+            'stake_over': bool(stake_over),
+            'eligible_for_rewards': bool(score)
+        }
+        for public_key, score, longevity, stake_over in zip(public_keys, scores, longevity, stake_overs > 0)
+    })
@@ -6,10 +6,11 @@ from src.core import models
 @admin.register(models.Node)
 class NodeAdmin(admin.ModelAdmin):
     save_on_top = True
-    list_display = ('public_key', 'height', 'network_weight', 'total_stake', 'active_bid', 'percent_of_network',)
+    list_display = ('public_key', 'height', 'network_weight', 'total_stake', 'active_bid', 'percent_of_network',
+                    'failures', 'last_success', 'latency', 'archived',)
     list_display_links = ('public_key',)
-    search_fields = ('public_key',)
-    list_filter = ('height', 'active_bid', )
+    search_fields = ('public_key', 'ip',)
+    list_filter = ('height', 'active_bid', 'archived',)
     list_per_page = 1_000
     list_max_show_all = 10_000
 
@@ -22,6 +23,8 @@ class ScoreAdmin(admin.ModelAdmin):
     list_display_links = ('node',)
     search_fields = ('node__public_key', 'current_block', 'timestamp',)
     list_filter = ('active_bid', 'active', 'timestamp',)
+    list_select_related = ('node',)
+    ordering = ('-current_block', '-total_stake',)
     list_per_page = 1_000
     list_max_show_all = 10_000
 
@@ -33,5 +36,53 @@ class ScoringAdmin(admin.ModelAdmin):
     list_display_links = ('public_key',)
     search_fields = ('public_key', 'timestamp',)
     list_filter = ('type', 'stake_over', 'eligible_for_rewards', 'timestamp',)
+    ordering = ('-score', '-longevity',)
+    list_per_page = 1_000
+    list_max_show_all = 10_000
+
+
+@admin.register(models.DayCounter)
+class DayCounterAdmin(admin.ModelAdmin):
+    save_on_top = True
+    list_display = ('public_key', 'day', 'intervals', 'active_intervals', 'stake_over',)
+    list_display_links = ('public_key',)
+    search_fields = ('public_key',)
+    list_filter = ('day', 'stake_over',)
+    list_per_page = 1_000
+    list_max_show_all = 10_000
+
+
+@admin.register(models.ScoreRollup)
+class ScoreRollupAdmin(admin.ModelAdmin):
+    save_on_top = True
+    list_display = ('node', 'day', 'intervals', 'active_intervals', 'stake_over_intervals', 'first_block',
+                    'last_block', 'total_stake', 'percent_of_network',)
+    list_display_links = ('node',)
+    search_fields = ('node__public_key',)
+    list_filter = ('day',)
+    list_select_related = ('node',)
+    list_per_page = 1_000
+    list_max_show_all = 10_000
+
+
+@admin.register(models.Leaderboard)
+class LeaderboardAdmin(admin.ModelAdmin):
+    save_on_top = True
+    list_display = ('public_key', 'rank', 'score', 'longevity', 'eligible_for_rewards', 'week',)
+    list_display_links = ('public_key',)
+    search_fields = ('public_key', 'week',)
+    list_filter = ('eligible_for_rewards', 'week',)
+    ordering = ('-period_start', 'rank',)
+    list_per_page = 1_000
+    list_max_show_all = 10_000
+
+
+@admin.register(models.Cycle)
+class CycleAdmin(admin.ModelAdmin):
+    save_on_top = True
+    list_display = ('started', 'finished', 'status', 'note',)
+    list_display_links = ('started',)
+    list_filter = ('status', 'started',)
+    ordering = ('-started',)
     list_per_page = 1_000
     list_max_show_all = 10_000
@@ -21,3 +21,9 @@ class ScoreSerializer(serializers.ModelSerializer):
     class Meta:
         model = models.Score
         fields = '__all__'
+
+
+class LeaderboardSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = models.Leaderboard
+        fields = '__all__'
@@ -8,7 +8,10 @@ urlpatterns = [
     path('scoring/quarters', views.get_quarters_view, name='quarters'),
     path('scoring/weeks/<str:quarter>', views.get_weeks_view, name='weeks'),
     path('scoring/days/<str:week>', views.get_days_view, name='days'),
-    path('scoring/intervals/<str:day>', views.get_intervals_view, name='intervals')
+    path('scoring/intervals/<str:day>', views.get_intervals_view, name='intervals'),
+    path('scoring/leaderboard', views.get_leaderboard_view, name='leaderboard'),
+    path('scoring/leaderboard/history', views.get_leaderboard_history_view, name='leaderboard_history'),
+    path('scoring/history', views.get_history_view, name='history')
 ]
 
 urlpatterns = format_suffix_patterns(urlpatterns)
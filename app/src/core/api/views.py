@@ -1,29 +1,208 @@
+from rest_framework import status
 from rest_framework.decorators import api_view
 from rest_framework.response import Response
+from django.conf import settings
+from django.db.models import Avg, Count, Max, Q
+from django.db.models.functions import ExtractMinute, Floor, TruncDay, TruncHour
+from django.utils import timezone
 
 import datetime
 
 from src.core import models
 from src.core.api import serializers
+from src.core.cache import cache_response
+
+
+def _get_period(period: str) -> (datetime.date, datetime.date,):
+    """Gets start and end dates of period string like 'Q4: 2024.10.01 - 2024.12.31'."""
+
+    try:
+        start_of_period, end_of_period = (part.strip() for part in period.split(':')[-1].split('-'))
+        start_of_period, end_of_period = (datetime.datetime.strptime(start_of_period, '%Y.%m.%d').date(),
+                                          datetime.datetime.strptime(end_of_period, '%Y.%m.%d').date())
+    except ValueError:
+        raise ValueError(f'Malformed period {period}, expected format is \'Q4: 2024.10.01 - 2024.12.31\'')
+
+    if start_of_period > end_of_period:
+        raise ValueError(f'Malformed period {period}, start is after end')
+
+    return start_of_period, end_of_period
+
+
+def _get_page(request) -> (int, int,):
+    """Gets limit and offset of the requested page from query parameters."""
+
+    try:
+        limit = min(int(request.GET.get('limit', settings.SCORING_PAGE_SIZE)), settings.SCORING_MAX_PAGE_SIZE)
+        offset = int(request.GET.get('offset', 0))
+    except ValueError:
+        raise ValueError('Malformed limit or offset, expected integers like \'limit=100&offset=200\'')
+
+    if limit < 0 or offset < 0:
+        raise ValueError('Limit and offset must not be negative')
+
+    return limit, offset
+
+
+def _filter_scoring(request, scoring):
+    """Filters scoring queryset by public key, eligible for rewards and timestamp query parameters."""
+
+    public_key = request.GET.get('public_key', None)
+    if public_key:
+        scoring = scoring.filter(public_key=public_key.strip().lower())
+
+    eligible_for_rewards = request.GET.get('eligible_for_rewards', None)
+    if eligible_for_rewards:
+        scoring = scoring.filter(eligible_for_rewards=eligible_for_rewards.strip().lower() in ('true', '1', 'yes'))
+
+    timestamp = request.GET.get('timestamp', None)
+    if timestamp:
+        scoring = scoring.filter(timestamp=timestamp.strip())
+
+    return scoring
+
+
+def _get_scoring_response(request, request_url, scoring, limit: int, offset: int) -> dict:
+    """Makes response with the requested page of scoring, count and unique timestamps are aggregated by Database."""
+
+    scoring = _filter_scoring(request, scoring)
+
+    serializer = serializers.ScoringSerializer(scoring[offset:offset + limit], many=True)
+
+    return {
+        'url': request_url,
+        'success': True,
+        'error': '',
+        'count': scoring.count(),
+        'limit': limit,
+        'offset': offset,
+        'unique_timestamps': sorted(scoring.order_by().values_list('timestamp', flat=True).distinct()),
+        'scoring': serializer.data
+    }
+
+
+def _get_compact_score(score: list, timestamp_field) -> dict:
+    """Makes columnar intervals, nodes are serialized once and interval fields are returned as parallel arrays."""
+
+    nodes = {interval.node_id: interval.node for interval in score}
+
+    return {
+        'nodes': serializers.NodeSerializer(nodes.values(), many=True).data,
+        'node': [interval.node_id for interval in score],
+        'timestamp': [timestamp_field.to_representation(interval.timestamp) for interval in score],
+        **{
+            field: [getattr(interval, field) for interval in score]
+            for field in ('current_block', 'network_weight', 'total_stake', 'active_bid', 'percent_of_network',
+                          'active')
+        }
+    }
+
+
+def _get_history_range(request) -> (datetime.datetime, datetime.datetime, str,):
+    """Gets start-end datetimes and resolution of public key history from query parameters."""
+
+    try:
+        end = datetime.datetime.strptime(request.GET.get('end', '').strip(), '%Y.%m.%d') \
+            if request.GET.get('end', None) else datetime.datetime.combine(timezone.localdate(), datetime.time.min)
+        start = datetime.datetime.strptime(request.GET.get('start', '').strip(), '%Y.%m.%d') \
+            if request.GET.get('start', None) else end - datetime.timedelta(days=6)
+    except ValueError:
+        raise ValueError('Malformed start or end, expected format is \'2024.10.01\'')
+
+    if start > end:
+        raise ValueError('Malformed range, start is after end')
+
+    if (end - start).days >= settings.SCORING_HISTORY_MAX_DAYS:
+        raise ValueError(f'Range is limited to {settings.SCORING_HISTORY_MAX_DAYS} days')
+
+    resolution = request.GET.get('resolution', '1h').strip()
+    if resolution not in ('5m', '1h', '1d'):
+        raise ValueError('Malformed resolution, expected one of 5m, 1h, 1d')
+
+    return timezone.make_aware(start), timezone.make_aware(end + datetime.timedelta(days=1)), resolution
+
+
+def _get_history_buckets(resolution: str) -> dict:
+    """Gets annotations grouping Score rows into 5 minute, hour or day buckets by Database."""
+
+    match resolution:
+        case '5m':
+            return {'period': TruncHour('timestamp'), 'slot': Floor(ExtractMinute('timestamp') / 5)}
+        case '1h':
+            return {'period': TruncHour('timestamp')}
+        case '1d':
+            return {'period': TruncDay('timestamp')}
+
+
+def _get_rollup_history(public_key: str, start: datetime.datetime, end: datetime.datetime, resolution: str,
+                        known_days: set) -> list:
+    """
+    Gets public key history points of compacted days which have no Score rows from their rollups,
+    per interval blocks are not kept after compaction, so lag is known only for day buckets.
+    """
+
+    rollups = list(models.ScoreRollup.objects.filter(
+        node__public_key=public_key,
+        day__gte=timezone.localtime(start).date(),
+        day__lt=timezone.localtime(end).date()
+    ).exclude(day__in=known_days).select_related('node'))
+
+    if not rollups:
+        return []
+
+    # Network tip of a compacted day is the last block of the most advanced node
+    tips = dict(models.ScoreRollup.objects.filter(
+        day__in={rollup.day for rollup in rollups}
+    ).values('day').annotate(tip=Max('last_block')).values_list('day', 'tip').order_by())
+
+    buckets = {}
+    for rollup in rollups:
+        if resolution == '1d':
+            bucket = buckets.setdefault(rollup.get_start(), {'block': 0, 'tip': tips[rollup.day], 'intervals': 0,
+                                                             'active_intervals': 0, 'stake': 0})
+            bucket['block'] = max(bucket['block'], rollup.last_block)
+            bucket['intervals'] += rollup.intervals
+            bucket['active_intervals'] += rollup.active_intervals
+            bucket['stake'] += rollup.percent_of_network * rollup.intervals
+            continue
+
+        for interval in rollup.get_scores():
+            timestamp = interval.timestamp if resolution == '5m' else interval.timestamp.replace(minute=0)
+            bucket = buckets.setdefault(timestamp, {'block': None, 'tip': None, 'intervals': 0,
+                                                    'active_intervals': 0, 'stake': 0})
+            bucket['intervals'] += 1
+            bucket['active_intervals'] += int(interval.active)
+            bucket['stake'] += interval.percent_of_network
+
+    return [{
+        'timestamp': timestamp,
+        'lag': bucket['tip'] - bucket['block'] if bucket['tip'] is not None else None,
+        'active': bucket['active_intervals'] / bucket['intervals'] if bucket['intervals'] else 0,
+        'percent_of_network': bucket['stake'] / bucket['intervals'] if bucket['intervals'] else 0
+    } for timestamp, bucket in buckets.items()]
 
 
 @api_view(['GET'])
+@cache_response
 def get_quarters_view(request, format=None):
     request_url = f"https://{request.get_host()}{request.get_full_path()}"
 
     try:
-        scoring = models.Scoring.objects.filter(type='Q')
+        limit, offset = _get_page(request)
+    except ValueError as error:
+        return Response({
+            'url': request_url,
+            'success': False,
+            'error': str(error).strip(),
+            'count': 0,
+            'unique_timestamps': [],
+            'scoring': []
+        }, status=status.HTTP_400_BAD_REQUEST)
 
-        serializer = serializers.ScoringSerializer(scoring, many=True)
+    try:
+        scoring = models.Scoring.objects.filter(type='Q').order_by('-score', '-longevity', 'id')
 
-        json_response = {
-            'url': request_url,
-            'success': True,
-            'error': '',
-            'count': len(serializer.data),
-            'unique_timestamps': sorted(set(item['timestamp'] for item in serializer.data)),
-            'scoring': serializer.data
-        }
+        json_response = _get_scoring_response(request, request_url, scoring, limit, offset)
     except Exception as error:
         json_response = {
             'url': request_url,
@@ -38,35 +217,153 @@ def get_quarters_view(request, format=None):
 
 
 @api_view(['GET'])
+@cache_response
 def get_weeks_view(request, quarter, format=None):
     request_url = f"https://{request.get_host()}{request.get_full_path()}"
 
     try:
-        start_of_quarter, end_of_quarter = (part.strip() for part in quarter.split(':')[-1].split('-'))
-        start_of_quarter, end_of_quarter = (datetime.datetime.strptime(start_of_quarter, '%Y.%m.%d'),
-                                            datetime.datetime.strptime(end_of_quarter, '%Y.%m.%d'))
+        start_of_quarter, end_of_quarter = _get_period(quarter)
+        limit, offset = _get_page(request)
+    except ValueError as error:
+        return Response({
+            'url': request_url,
+            'success': False,
+            'error': str(error).strip(),
+            'count': 0,
+            'unique_timestamps': [],
+            'scoring': []
+        }, status=status.HTTP_400_BAD_REQUEST)
+
+    try:
+        # Served by (type, period_start) index
+        scoring = models.Scoring.objects.filter(
+            type='W',
+            period_start__range=(start_of_quarter, end_of_quarter)
+        ).order_by('-score', '-longevity', 'id')
+
+        json_response = _get_scoring_response(request, request_url, scoring, limit, offset)
+    except Exception as error:
+        json_response = {
+            'url': request_url,
+            'success': False,
+            'error': str(error).strip(),
+            'count': 0,
+            'unique_timestamps': [],
+            'scoring': []
+        }
+
+    return Response(json_response)
 
-        weeks = []
-        for week in models.Scoring.objects.filter(type='W'):
-            start_of_week, end_of_week = (part.strip() for part in week.timestamp.split(':')[-1].split('-'))
-            start_of_week, end_of_week = (datetime.datetime.strptime(start_of_week, '%Y.%m.%d'),
-                                          datetime.datetime.strptime(end_of_week, '%Y.%m.%d'))
 
-            if start_of_quarter <= start_of_week <= end_of_quarter:
-                weeks.append(week.id)
+@api_view(['GET'])
+@cache_response
+def get_days_view(request, week, format=None):
+    request_url = f"https://{request.get_host()}{request.get_full_path()}"
 
-        scoring = models.Scoring.objects.filter(type='W', id__in=weeks)
+    try:
+        start_of_week, end_of_week = _get_period(week)
+        limit, offset = _get_page(request)
+    except ValueError as error:
+        return Response({
+            'url': request_url,
+            'success': False,
+            'error': str(error).strip(),
+            'count': 0,
+            'unique_timestamps': [],
+            'scoring': []
+        }, status=status.HTTP_400_BAD_REQUEST)
 
-        serializer = serializers.ScoringSerializer(scoring, many=True)
+    try:
+        # Served by (type, period_start) index
+        scoring = models.Scoring.objects.filter(
+            type='D',
+            period_start__range=(start_of_week, end_of_week)
+        ).order_by('-score', '-longevity', 'id')
 
+        json_response = _get_scoring_response(request, request_url, scoring, limit, offset)
+    except Exception as error:
         json_response = {
             'url': request_url,
-            'success': True,
-            'error': '',
-            'count': len(serializer.data),
-            'unique_timestamps': sorted(set(item['timestamp'] for item in serializer.data)),
-            'scoring': serializer.data
+            'success': False,
+            'error': str(error).strip(),
+            'count': 0,
+            'unique_timestamps': [],
+            'scoring': []
         }
+
+    return Response(json_response)
+
+
+@api_view(['GET'])
+@cache_response
+def get_intervals_view(request, day, format=None):
+    request_url = f"https://{request.get_host()}{request.get_full_path()}"
+
+    public_key = request.GET.get('public_key', None)
+
+    try:
+        limit, offset = _get_page(request)
+    except ValueError as error:
+        return Response({
+            'url': request_url,
+            'success': False,
+            'error': str(error).strip(),
+            'count': 0,
+            'unique_timestamps': [],
+            'scoring': []
+        }, status=status.HTTP_400_BAD_REQUEST)
+
+    try:
+        if public_key is not None:
+            start_of_day = timezone.make_aware(datetime.datetime.strptime(day, '%Y.%m.%d'))
+
+            score = models.Score.objects.filter(
+                node__public_key=public_key.strip().lower(),
+                timestamp__gte=start_of_day,
+                timestamp__lt=start_of_day + datetime.timedelta(days=1)
+            ).select_related('node').order_by('-current_block', '-total_stake', 'id')
+
+            count, timestamps = score.count(), score.order_by().values_list('timestamp', flat=True).distinct()
+
+            # Score rows older than retention window are available only from day rollups
+            if not count:
+                score = []
+                for rollup in models.ScoreRollup.objects.filter(
+                        node__public_key=public_key.strip().lower(),
+                        day=start_of_day.date()
+                ).select_related('node'):
+                    score.extend(rollup.get_scores())
+
+                count, timestamps = len(score), set(interval.timestamp for interval in score)
+
+            score = list(score[offset:offset + limit])
+            timestamp_field = serializers.ScoreSerializer().fields['timestamp']
+
+            # Compact format is meant for per key daily charts, where nested node repeats in every interval
+            if request.GET.get('compact', '').strip().lower() in ('true', '1', 'yes'):
+                data = _get_compact_score(score, timestamp_field)
+            else:
+                data = serializers.ScoreSerializer(score, many=True).data
+
+            json_response = {
+                'url': request_url,
+                'success': True,
+                'error': '',
+                'count': count,
+                'limit': limit,
+                'offset': offset,
+                'unique_timestamps': sorted(timestamp_field.to_representation(timestamp) for timestamp in timestamps),
+                'scoring': data
+            }
+        else:
+            json_response = {
+                'url': request_url,
+                'success': False,
+                'error': 'No public key provided',
+                'count': 0,
+                'unique_timestamps': [],
+                'scoring': []
+            }
     except Exception as error:
         json_response = {
             'url': request_url,
@@ -81,31 +378,53 @@ def get_weeks_view(request, quarter, format=None):
 
 
 @api_view(['GET'])
-def get_days_view(request, week, format=None):
+@cache_response
+def get_leaderboard_view(request, format=None):
     request_url = f"https://{request.get_host()}{request.get_full_path()}"
 
     try:
-        start_of_week, end_of_week = (part.strip() for part in week.split(':')[-1].split('-'))
-        start_of_week, end_of_week = (datetime.datetime.strptime(start_of_week, '%Y.%m.%d'),
-                                      datetime.datetime.strptime(end_of_week, '%Y.%m.%d'))
+        limit, offset = _get_page(request)
+    except ValueError as error:
+        return Response({
+            'url': request_url,
+            'success': False,
+            'error': str(error).strip(),
+            'count': 0,
+            'unique_timestamps': [],
+            'scoring': []
+        }, status=status.HTTP_400_BAD_REQUEST)
+
+    try:
+        # Latest week snapshot is returned if no week provided
+        week = request.GET.get('week', None) or models.Leaderboard.objects.order_by(
+            '-period_start', '-id'
+        ).values_list('week', flat=True).first() or ''
+
+        leaderboard = models.Leaderboard.objects.filter(week=week.strip()).order_by('rank')
 
-        days = []
-        for day in models.Scoring.objects.filter(type='D'):
-            day_timestamp = datetime.datetime.strptime(day.timestamp, '%Y.%m.%d')
+        public_key = request.GET.get('public_key', None)
+        if public_key:
+            leaderboard = leaderboard.filter(public_key=public_key.strip().lower())
 
-            if start_of_week <= day_timestamp <= end_of_week:
-                days.append(day.id)
+        # The last eligible for rewards position is the eligibility cutoff of the week
+        cutoff = models.Leaderboard.objects.filter(
+            week=week.strip(),
+            eligible_for_rewards=True
+        ).order_by('-rank').first()
 
-        scoring = models.Scoring.objects.filter(type='D', id__in=days)
+        count = leaderboard.count()
 
-        serializer = serializers.ScoringSerializer(scoring, many=True)
+        serializer = serializers.LeaderboardSerializer(leaderboard[offset:offset + limit], many=True)
 
         json_response = {
             'url': request_url,
             'success': True,
             'error': '',
-            'count': len(serializer.data),
-            'unique_timestamps': sorted(set(item['timestamp'] for item in serializer.data)),
+            'count': count,
+            'limit': limit,
+            'offset': offset,
+            'unique_timestamps': [week.strip()] if count else [],
+            'cutoff': serializers.LeaderboardSerializer(cutoff).data if cutoff is not None else None,
             'scoring': serializer.data
         }
     except Exception as error:
@@ -122,25 +441,41 @@ def get_days_view(request, week, format=None):
 
 
 @api_view(['GET'])
-def get_intervals_view(request, day, format=None):
+@cache_response
+def get_leaderboard_history_view(request, format=None):
     request_url = f"https://{request.get_host()}{request.get_full_path()}"
 
     public_key = request.GET.get('public_key', None)
 
     try:
-        if public_key is not None:
-            day = datetime.datetime.strptime(day, '%Y.%m.%d')
+        limit, offset = _get_page(request)
+    except ValueError as error:
+        return Response({
+            'url': request_url,
+            'success': False,
+            'error': str(error).strip(),
+            'count': 0,
+            'unique_timestamps': [],
+            'scoring': []
+        }, status=status.HTTP_400_BAD_REQUEST)
 
-            score = models.Score.objects.filter(node__public_key=public_key.strip().lower(), timestamp__date=day)
+    try:
+        if public_key is not None:
+            # Rank of the public key in each week snapshot, latest week first
+            leaderboard = models.Leaderboard.objects.filter(
+                public_key=public_key.strip().lower()
+            ).order_by('-period_start', '-id')
 
-            serializer = serializers.ScoreSerializer(score, many=True)
+            serializer = serializers.LeaderboardSerializer(leaderboard[offset:offset + limit], many=True)
 
             json_response = {
                 'url': request_url,
                 'success': True,
                 'error': '',
-                'count': len(serializer.data),
-                'unique_timestamps': sorted(set(item['timestamp'] for item in serializer.data)),
+                'count': leaderboard.count(),
+                'limit': limit,
+                'offset': offset,
+                'unique_timestamps': sorted(leaderboard.order_by().values_list('week', flat=True).distinct()),
                 'scoring': serializer.data
             }
         else:
@@ -163,3 +498,98 @@ def get_intervals_view(request, day, format=None):
         }
 
     return Response(json_response)
+
+
+@api_view(['GET'])
+@cache_response
+def get_history_view(request, format=None):
+    request_url = f"https://{request.get_host()}{request.get_full_path()}"
+
+    public_key = request.GET.get('public_key', None)
+
+    try:
+        start, end, resolution = _get_history_range(request)
+    except ValueError as error:
+        return Response({
+            'url': request_url,
+            'success': False,
+            'error': str(error).strip(),
+            'count': 0,
+            'unique_timestamps': [],
+            'scoring': []
+        }, status=status.HTTP_400_BAD_REQUEST)
+
+    try:
+        if public_key is not None:
+            buckets = _get_history_buckets(resolution)
+
+            score = models.Score.objects.filter(timestamp__gte=start, timestamp__lt=end).annotate(**buckets)
+
+            history = list(score.filter(node__public_key=public_key.strip().lower()).values(*buckets).annotate(
+                block=Max('current_block'),
+                intervals=Count('id'),
+                active_intervals=Count('id', filter=Q(active=True)),
+                percent_of_network=Avg('percent_of_network')
+            ).order_by(*buckets))
+
+            # Network tip of a bucket is the max height recorded by any node during it,
+            # only buckets the public key has are aggregated
+            tips = {
+                (row['period'], row.get('slot', 0)): row['tip']
+                for row in score.filter(period__in={row['period'] for row in history}).values(*buckets).annotate(
+                    tip=Max('current_block')
+                ).order_by()
+            }
+
+            # Lag is taken at the end of the bucket, share of active intervals and average stake over the bucket
+            points = [{
+                'timestamp': row['period'] + int(row.get('slot', 0)) * models.ScoreRollup.INTERVAL,
+                'lag': tips[(row['period'], row.get('slot', 0))] - row['block'],
+                'active': row['active_intervals'] / row['intervals'],
+                'percent_of_network': row['percent_of_network']
+            } for row in history]
+
+            # Days older than retention window are available only from day rollups
+            points.extend(_get_rollup_history(
+                public_key.strip().lower(), start, end, resolution,
+                {timezone.localtime(row['period']).date() for row in history}
+            ))
+            points.sort(key=lambda point: point['timestamp'])
+
+            timestamp_field = serializers.ScoreSerializer().fields['timestamp']
+            data = {
+                'timestamp': [timestamp_field.to_representation(point['timestamp']) for point in points],
+                'lag': [point['lag'] for point in points],
+                'active': [round(point['active'], 4) for point in points],
+                'percent_of_network': [round(point['percent_of_network'], 4) for point in points]
+            }
+
+            json_response = {
+                'url': request_url,
+                'success': True,
+                'error': '',
+                'count': len(data['timestamp']),
+                'resolution': resolution,
+                'unique_timestamps': [],
+                'scoring': data
+            }
+        else:
+            json_response = {
+                'url': request_url,
+                'success': False,
+                'error': 'No public key provided',
+                'count': 0,
+                'unique_timestamps': [],
+                'scoring': []
+            }
+    except Exception as error:
+        json_response = {
+            'url': request_url,
+            'success': False,
+            'error': str(error).strip(),
+            'count': 0,
+            'unique_timestamps': [],
+            'scoring': []
+        }
+
+    return Response(json_response)
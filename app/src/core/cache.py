@@ -0,0 +1,149 @@
+import functools
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from rest_framework.response import Response
+
+
+CYCLE_VERSION_KEY = 'scoring:cycle_version'
+CYCLE_FINISHED_KEY = 'scoring:cycle_finished'
+CYCLE_LEASE_KEY = 'scoring:cycle_lease'
+CYCLE_CLOSED_KEY = 'scoring:cycle_closed:{}'
+
+
+def get_cycle_version() -> int:
+    """Gets version of the latest finished scoring cycle, used to invalidate cached responses."""
+
+    return cache.get_or_set(CYCLE_VERSION_KEY, 1, timeout=None)
+
+
+def get_cycle() -> (int, float,):
+    """Gets version and finish time of the latest finished scoring cycle, finish time is None if not recorded."""
+
+    cycle = cache.get_many([CYCLE_VERSION_KEY, CYCLE_FINISHED_KEY])
+
+    return cycle.get(CYCLE_VERSION_KEY) or get_cycle_version(), cycle.get(CYCLE_FINISHED_KEY)
+
+
+def bump_cycle_version() -> int:
+    """Bumps scoring cycle version and records its finish time, so responses of previous cycles are not used anymore."""
+
+    try:
+        version = cache.incr(CYCLE_VERSION_KEY)
+    except ValueError:
+        version = 2
+        cache.set(CYCLE_VERSION_KEY, version, timeout=None)
+
+    cache.set(CYCLE_FINISHED_KEY, time.time(), timeout=None)
+
+    return version
+
+
+def _set_cycle_headers(response, etag: str, finished: float):
+    """Sets ETag and Last-Modified headers of successful response from the scoring cycle it belongs to."""
+
+    if etag is not None and response.data.get('success'):
+        response['ETag'] = etag
+        response['Last-Modified'] = http_date(finished)
+
+    return response
+
+
+def _get_not_modified(request, etag: str, finished: float):
+    """Gets 304 response if the client already has the response of the scoring cycle, otherwise None."""
+
+    if etag is None:
+        return None
+
+    not_modified = get_conditional_response(request, etag=etag, last_modified=int(finished))
+    if not_modified is not None:
+        not_modified['ETag'] = etag
+
+    return not_modified
+
+
+def acquire_cycle_lease(token: str) -> bool:
+    """Acquires lease of the monitoring cycle for given token, returns False if another cycle holds it."""
+
+    return cache.add(CYCLE_LEASE_KEY, token, timeout=settings.CYCLE_LEASE_TIMEOUT)
+
+
+# Deletes the lease only if it still holds the given token, in one step on Redis side
+RELEASE_LEASE_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+
+def release_cycle_lease(token: str) -> None:
+    """Releases lease of the monitoring cycle if it is still held by given token."""
+
+    client = getattr(cache, '_cache', None)
+
+    # Cache backends other than Redis have no scripts, lease is checked and deleted in two steps there
+    if not hasattr(client, 'get_client'):
+        if cache.get(CYCLE_LEASE_KEY) == token:
+            cache.delete(CYCLE_LEASE_KEY)
+        return
+
+    # Lease which expired and was taken by the next cycle between check and delete would be deleted otherwise
+    key = cache.make_and_validate_key(CYCLE_LEASE_KEY)
+    client.get_client(key, write=True).eval(RELEASE_LEASE_SCRIPT, 1, key, client._serializer.dumps(token))
+
+
+def close_cycle(token: str) -> bool:
+    """Marks the monitoring cycle of given token as closed, returns False if it has been closed already."""
+
+    return cache.add(CYCLE_CLOSED_KEY.format(token), True, timeout=settings.CYCLE_LEASE_TIMEOUT)
+
+
+def is_cycle_closed(token: str) -> bool:
+    """Checks if the monitoring cycle of given token has been closed already."""
+
+    return cache.get(CYCLE_CLOSED_KEY.format(token)) is not None
+
+
+def cache_response(view):
+    """
+    Caches successful view responses in Redis by endpoint and parameters until the next scoring cycle,
+    conditional requests of clients which already have the response of the current cycle get 304.
+    """
+
+    @functools.wraps(view)
+    def wrapper(request, *args, **kwargs):
+        full_url = f"{request.get_host()}{request.get_full_path()}"
+        key = f"scoring:{view.__name__}:{hashlib.md5(full_url.encode()).hexdigest()}"
+
+        # Serve response without cache if Redis is not available
+        try:
+            version, finished = get_cycle()
+            data = cache.get(key, version=version)
+        except Exception:
+            return view(request, *args, **kwargs)
+
+        # Cycle version alone may repeat after Redis is flushed, while its finish time does not
+        etag = f'"{version}-{int(finished)}"' if finished is not None else None
+
+        # Only successful responses carry the cycle validators, so malformed requests still get their errors
+        if data is not None:
+            return _get_not_modified(request, etag, finished) or _set_cycle_headers(Response(data), etag, finished)
+
+        response = view(request, *args, **kwargs)
+
+        if not response.data.get('success'):
+            return response
+
+        try:
+            cache.set(key, response.data, timeout=settings.SCORING_CACHE_TIMEOUT, version=version)
+        except Exception:
+            pass
+
+        return _get_not_modified(request, etag, finished) or _set_cycle_headers(response, etag, finished)
+
+    return wrapper
@@ -0,0 +1,27 @@
+import asyncio
+import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+
+from src.casper import services
+
+
+class Command(BaseCommand):
+    help = 'Recomputes day, week, eligible for rewards and quarter scoring for given range of days from stored scores'
+
+    def add_arguments(self, parser):
+        parser.add_argument('start', help='First day of the range, e.g. 2024.07.01')
+        parser.add_argument('end', help='Last day of the range, e.g. 2024.09.30')
+        parser.add_argument('--workers', type=int, default=None, help='Number of worker processes counting days')
+
+    def handle(self, *args, **options):
+        try:
+            start_day, end_day = (datetime.datetime.strptime(options[name], '%Y.%m.%d').date()
+                                  for name in ('start', 'end'))
+        except ValueError as error:
+            raise CommandError(f'Invalid day: {error}')
+
+        if start_day > end_day:
+            raise CommandError('Start day must not be after end day')
+
+        asyncio.run(services.recompute_scoring(start_day, end_day, options['workers']))
@@ -0,0 +1,41 @@
+# Generated by Django 5.0.6 on 2026-10-18 16:28
+
+from django.db import migrations, models
+
+
+def merge_duplicate_nodes(apps, schema_editor):
+    """Keeps the first node for every duplicated IP address and moves scores of the others to it."""
+
+    Node = apps.get_model('core', 'Node')
+    Score = apps.get_model('core', 'Score')
+
+    duplicates = Node.objects.values('ip').annotate(count=models.Count('id')).filter(count__gt=1)
+
+    for duplicate in duplicates:
+        kept, *others = Node.objects.filter(ip=duplicate['ip']).order_by('id')
+        others_ids = [node.id for node in others]
+
+        Score.objects.filter(node_id__in=others_ids).update(node=kept)
+
+        # Keep public key of the duplicate if the first node does not have one
+        if not kept.public_key:
+            kept.public_key = next((node.public_key for node in others if node.public_key), '')
+            kept.save(update_fields=['public_key'])
+
+        Node.objects.filter(id__in=others_ids).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_duplicate_nodes, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='node',
+            name='ip',
+            field=models.GenericIPAddressField(unique=True, verbose_name='IP Address'),
+        ),
+    ]
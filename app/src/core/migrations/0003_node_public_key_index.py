@@ -0,0 +1,18 @@
+# Generated by Django 5.0.6 on 2026-10-18 16:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0002_node_ip_unique'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='node',
+            name='public_key',
+            field=models.CharField(db_index=True, default='', max_length=128, verbose_name='Public Key'),
+        ),
+    ]
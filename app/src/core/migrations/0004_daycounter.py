@@ -0,0 +1,32 @@
+# Generated by Django 5.0.6 on 2026-10-18 16:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0003_node_public_key_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DayCounter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('public_key', models.CharField(max_length=128, verbose_name='Public Key')),
+                ('day', models.DateField(verbose_name='Day')),
+                ('intervals', models.PositiveIntegerField(default=0, verbose_name='Intervals')),
+                ('active_intervals', models.PositiveIntegerField(default=0, verbose_name='Active Intervals')),
+                ('stake_over', models.BooleanField(default=False, verbose_name='Stake Over')),
+            ],
+            options={
+                'verbose_name': 'Day Counter',
+                'verbose_name_plural': 'Day Counters',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='daycounter',
+            constraint=models.UniqueConstraint(fields=('day', 'public_key'), name='unique_day_counter'),
+        ),
+    ]
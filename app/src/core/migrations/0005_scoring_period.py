@@ -0,0 +1,53 @@
+# Generated by Django 5.0.6 on 2026-10-18 16:31
+
+import datetime
+
+from django.db import migrations, models
+
+
+def fill_scoring_periods(apps, schema_editor):
+    """Parses period start-end dates of existing scoring objects from their timestamps."""
+
+    Scoring = apps.get_model('core', 'Scoring')
+
+    batch = []
+    for scoring in Scoring.objects.filter(period_start__isnull=True).only('id', 'timestamp').iterator():
+        try:
+            # Day timestamp is a single date, week and quarter ones are `W1: <start> - <end>`
+            dates = [part.strip() for part in scoring.timestamp.split(':')[-1].split('-')]
+            scoring.period_start = datetime.datetime.strptime(dates[0], '%Y.%m.%d').date()
+            scoring.period_end = datetime.datetime.strptime(dates[-1], '%Y.%m.%d').date()
+        except ValueError:
+            continue
+
+        batch.append(scoring)
+        if len(batch) >= 1000:
+            Scoring.objects.bulk_update(batch, ['period_start', 'period_end'])
+            batch = []
+
+    Scoring.objects.bulk_update(batch, ['period_start', 'period_end'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0004_daycounter'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='scoring',
+            name='period_end',
+            field=models.DateField(blank=True, null=True, verbose_name='Period End'),
+        ),
+        migrations.AddField(
+            model_name='scoring',
+            name='period_start',
+            field=models.DateField(blank=True, null=True, verbose_name='Period Start'),
+        ),
+        migrations.RunPython(fill_scoring_periods, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='scoring',
+            index=models.Index(fields=['type', 'period_start'], name='scoring_type_period_idx'),
+        ),
+    ]
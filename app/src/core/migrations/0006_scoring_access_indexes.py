@@ -0,0 +1,58 @@
+# Generated by Django 5.0.6 on 2026-10-18 16:32
+
+from django.db import migrations, models
+
+
+def merge_duplicate_scorings(apps, schema_editor):
+    """Keeps the first scoring object for every duplicated public key, type and timestamp."""
+
+    Scoring = apps.get_model('core', 'Scoring')
+
+    duplicates = Scoring.objects.values('public_key', 'type', 'timestamp').annotate(
+        count=models.Count('id')
+    ).filter(count__gt=1).order_by()
+
+    for duplicate in duplicates:
+        kept, *others = Scoring.objects.filter(**{
+            'public_key': duplicate['public_key'],
+            'type': duplicate['type'],
+            'timestamp': duplicate['timestamp']
+        }).order_by('id')
+
+        # Keep stake over flag if any of the duplicates has it
+        if not kept.stake_over and any(scoring.stake_over for scoring in others):
+            kept.stake_over = True
+            kept.save(update_fields=['stake_over'])
+
+        Scoring.objects.filter(id__in=[scoring.id for scoring in others]).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0005_scoring_period'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='score',
+            options={'verbose_name': 'Score', 'verbose_name_plural': 'Scores'},
+        ),
+        migrations.AlterModelOptions(
+            name='scoring',
+            options={'verbose_name': 'Scoring', 'verbose_name_plural': 'Scoring'},
+        ),
+        migrations.AddIndex(
+            model_name='score',
+            index=models.Index(fields=['node', 'timestamp'], name='score_node_timestamp_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='score',
+            index=models.Index(fields=['timestamp'], name='score_timestamp_idx'),
+        ),
+        migrations.RunPython(merge_duplicate_scorings, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='scoring',
+            constraint=models.UniqueConstraint(fields=('type', 'timestamp', 'public_key'), name='unique_scoring'),
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 5.0.6 on 2026-10-18 16:37
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0006_scoring_access_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ScoreRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField(verbose_name='Day')),
+                ('recorded_slots', models.BinaryField(max_length=36, verbose_name='Recorded Slots')),
+                ('active_slots', models.BinaryField(max_length=36, verbose_name='Active Slots')),
+                ('intervals', models.PositiveIntegerField(default=0, verbose_name='Intervals')),
+                ('active_intervals', models.PositiveIntegerField(default=0, verbose_name='Active Intervals')),
+                ('stake_over_intervals', models.PositiveIntegerField(default=0, verbose_name='Stake Over Intervals')),
+                ('first_block', models.BigIntegerField(default=0, verbose_name='First Block')),
+                ('last_block', models.BigIntegerField(default=0, verbose_name='Last Block')),
+                ('network_weight', models.BigIntegerField(default=0, verbose_name='Network Weight')),
+                ('total_stake', models.BigIntegerField(default=0, verbose_name='Total Stake')),
+                ('active_bid', models.BooleanField(default=False, verbose_name='Active Bid')),
+                ('percent_of_network', models.FloatField(default=0, verbose_name='Percent Of Network')),
+                ('node', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='core.node', verbose_name='Node')),
+            ],
+            options={
+                'verbose_name': 'Score Rollup',
+                'verbose_name_plural': 'Score Rollups',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='scorerollup',
+            constraint=models.UniqueConstraint(fields=('day', 'node'), name='unique_score_rollup'),
+        ),
+    ]
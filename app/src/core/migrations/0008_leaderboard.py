@@ -0,0 +1,69 @@
+# Generated by Django 5.0.6 on 2026-10-18 16:50
+
+from django.db import migrations, models
+
+
+def fill_leaderboards(apps, schema_editor):
+    """Makes leaderboard snapshots of existing weeks from their week scoring."""
+
+    Scoring = apps.get_model('core', 'Scoring')
+    Leaderboard = apps.get_model('core', 'Leaderboard')
+
+    leaderboards, week, rank = [], None, 0
+    for scoring in Scoring.objects.filter(type='W').order_by('timestamp', '-score', '-longevity', 'id').iterator():
+        rank = rank + 1 if scoring.timestamp == week else 1
+        week = scoring.timestamp
+
+        leaderboards.append(Leaderboard(
+            week=scoring.timestamp,
+            period_start=scoring.period_start,
+            period_end=scoring.period_end,
+            public_key=scoring.public_key,
+            rank=rank,
+            score=scoring.score,
+            longevity=scoring.longevity,
+            eligible_for_rewards=scoring.eligible_for_rewards
+        ))
+        if len(leaderboards) >= 1000:
+            Leaderboard.objects.bulk_create(leaderboards)
+            leaderboards = []
+
+    Leaderboard.objects.bulk_create(leaderboards)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0007_scorerollup'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Leaderboard',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('week', models.CharField(max_length=128, verbose_name='Week')),
+                ('period_start', models.DateField(blank=True, null=True, verbose_name='Period Start')),
+                ('period_end', models.DateField(blank=True, null=True, verbose_name='Period End')),
+                ('public_key', models.CharField(max_length=128, verbose_name='Public Key')),
+                ('rank', models.PositiveIntegerField(verbose_name='Rank')),
+                ('score', models.FloatField(default=0, verbose_name='Score')),
+                ('longevity', models.FloatField(default=0, verbose_name='Longevity')),
+                ('eligible_for_rewards', models.BooleanField(default=False, verbose_name='Eligible for Rewards')),
+            ],
+            options={
+                'verbose_name': 'Leaderboard',
+                'verbose_name_plural': 'Leaderboards',
+                'indexes': [models.Index(fields=['public_key', 'period_start'], name='leaderboard_key_period_idx'), models.Index(fields=['period_start'], name='leaderboard_period_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='leaderboard',
+            constraint=models.UniqueConstraint(fields=('week', 'rank'), name='unique_leaderboard_rank'),
+        ),
+        migrations.AddConstraint(
+            model_name='leaderboard',
+            constraint=models.UniqueConstraint(fields=('week', 'public_key'), name='unique_leaderboard_public_key'),
+        ),
+        migrations.RunPython(fill_leaderboards, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 5.0.6 on 2026-10-18 16:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0008_leaderboard'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='node',
+            name='archived',
+            field=models.BooleanField(db_index=True, default=False, verbose_name='Archived'),
+        ),
+        migrations.AddField(
+            model_name='node',
+            name='failing_since',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='Failing Since'),
+        ),
+        migrations.AddField(
+            model_name='node',
+            name='failures',
+            field=models.PositiveIntegerField(default=0, verbose_name='Consecutive Failures'),
+        ),
+        migrations.AddField(
+            model_name='node',
+            name='last_success',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='Last Success'),
+        ),
+        migrations.AddField(
+            model_name='node',
+            name='latency',
+            field=models.FloatField(blank=True, null=True, verbose_name='Latency'),
+        ),
+        migrations.AddField(
+            model_name='node',
+            name='next_poll',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='Next Poll'),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.0.6 on 2026-10-18 16:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0009_node_health'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Cycle',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('started', models.DateTimeField(db_index=True, verbose_name='Started')),
+                ('finished', models.DateTimeField(auto_now_add=True, verbose_name='Finished')),
+                ('status', models.CharField(choices=[('C', 'Completed'), ('L', 'Late'), ('S', 'Skipped'), ('F', 'Failed')], default='C', max_length=1, verbose_name='Status')),
+                ('timings', models.JSONField(blank=True, default=dict, verbose_name='Stage Timings')),
+                ('note', models.CharField(blank=True, default='', max_length=512, verbose_name='Note')),
+            ],
+            options={
+                'verbose_name': 'Cycle',
+                'verbose_name_plural': 'Cycles',
+            },
+        ),
+    ]
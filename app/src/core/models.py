@@ -1,4 +1,7 @@
+import datetime
+
 from django.db import models
+from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 
 
@@ -6,13 +9,19 @@ class Node(models.Model):
     """
         Class for Casper Node
     """
-    ip = models.GenericIPAddressField(_("IP Address"), max_length=16)
-    public_key = models.CharField(_("Public Key"), max_length=128, default='')
+    ip = models.GenericIPAddressField(_("IP Address"), max_length=16, unique=True)
+    public_key = models.CharField(_("Public Key"), max_length=128, default='', db_index=True)
     height = models.BigIntegerField(_("Height"), default=0)
     network_weight = models.BigIntegerField(_("Network Weight"), default=0)
     total_stake = models.BigIntegerField(_("Total Stake"), default=0)
     active_bid = models.BooleanField(_("Active Bid"), default=False)
     percent_of_network = models.FloatField(_("Percent Of Network"), default=0)
+    failures = models.PositiveIntegerField(_("Consecutive Failures"), default=0)
+    failing_since = models.DateTimeField(_("Failing Since"), null=True, blank=True)
+    last_success = models.DateTimeField(_("Last Success"), null=True, blank=True)
+    latency = models.FloatField(_("Latency"), null=True, blank=True)
+    next_poll = models.DateTimeField(_("Next Poll"), null=True, blank=True)
+    archived = models.BooleanField(_("Archived"), default=False, db_index=True)
 
     class Meta:
         ordering = ('-total_stake', '-height',)
@@ -40,7 +49,10 @@ class Score(models.Model):
     timestamp = models.DateTimeField(_("Timestamp"), auto_now_add=True)
 
     class Meta:
-        ordering = ('-current_block', '-total_stake',)
+        indexes = [
+            models.Index(fields=('node', 'timestamp',), name='score_node_timestamp_idx'),
+            models.Index(fields=('timestamp',), name='score_timestamp_idx'),
+        ]
         verbose_name = _("Score")
         verbose_name_plural = _("Scores")
 
@@ -68,9 +80,16 @@ class Scoring(models.Model):
     stake_over = models.BooleanField(_("Stake Over"), default=False)
     eligible_for_rewards = models.BooleanField(_("Eligible for Rewards"), default=False)
     timestamp = models.CharField(_("Timestamp"), max_length=128)
+    period_start = models.DateField(_("Period Start"), null=True, blank=True)
+    period_end = models.DateField(_("Period End"), null=True, blank=True)
 
     class Meta:
-        ordering = ('-score', '-longevity',)
+        constraints = [
+            models.UniqueConstraint(fields=('type', 'timestamp', 'public_key',), name='unique_scoring'),
+        ]
+        indexes = [
+            models.Index(fields=('type', 'period_start',), name='scoring_type_period_idx'),
+        ]
         verbose_name = _("Scoring")
         verbose_name_plural = _("Scoring")
 
@@ -79,3 +98,174 @@ class Scoring(models.Model):
 
     def __str__(self):
         return f"{self.public_key}"
+
+
+class DayCounter(models.Model):
+    """
+        Class for Casper Node Running Day Counters
+    """
+    public_key = models.CharField(_("Public Key"), max_length=128)
+    day = models.DateField(_("Day"))
+    intervals = models.PositiveIntegerField(_("Intervals"), default=0)
+    active_intervals = models.PositiveIntegerField(_("Active Intervals"), default=0)
+    stake_over = models.BooleanField(_("Stake Over"), default=False)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=('day', 'public_key',), name='unique_day_counter'),
+        ]
+        verbose_name = _("Day Counter")
+        verbose_name_plural = _("Day Counters")
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+
+    def __str__(self):
+        return f"{self.public_key}"
+
+
+class ScoreRollup(models.Model):
+    """
+        Class for Casper Node Compacted Day Scores
+    """
+    INTERVAL = datetime.timedelta(minutes=5)
+    SLOTS = 288
+
+    node = models.ForeignKey(Node, on_delete=models.CASCADE, verbose_name=(_("Node")))
+    day = models.DateField(_("Day"))
+    recorded_slots = models.BinaryField(_("Recorded Slots"), max_length=SLOTS // 8)
+    active_slots = models.BinaryField(_("Active Slots"), max_length=SLOTS // 8)
+    intervals = models.PositiveIntegerField(_("Intervals"), default=0)
+    active_intervals = models.PositiveIntegerField(_("Active Intervals"), default=0)
+    stake_over_intervals = models.PositiveIntegerField(_("Stake Over Intervals"), default=0)
+    first_block = models.BigIntegerField(_("First Block"), default=0)
+    last_block = models.BigIntegerField(_("Last Block"), default=0)
+    network_weight = models.BigIntegerField(_("Network Weight"), default=0)
+    total_stake = models.BigIntegerField(_("Total Stake"), default=0)
+    active_bid = models.BooleanField(_("Active Bid"), default=False)
+    percent_of_network = models.FloatField(_("Percent Of Network"), default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=('day', 'node',), name='unique_score_rollup'),
+        ]
+        verbose_name = _("Score Rollup")
+        verbose_name_plural = _("Score Rollups")
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+
+    def __str__(self):
+        return f"{self.node.public_key}"
+
+    def get_start(self) -> datetime.datetime:
+        """Gets start datetime of the rollup day."""
+
+        return timezone.make_aware(datetime.datetime.combine(self.day, datetime.time.min))
+
+    def add_score(self, score: dict) -> None:
+        """Adds Score row values of the rollup day into slots bitmaps and summary."""
+
+        if not self.intervals:
+            self.recorded_slots, self.active_slots = bytearray(self.SLOTS // 8), bytearray(self.SLOTS // 8)
+            self.first_block = score['current_block']
+
+        # Slot is the index of 5 minute interval in the day
+        slot = min((score['timestamp'] - self.get_start()) // self.INTERVAL, self.SLOTS - 1)
+        self.recorded_slots[slot // 8] |= 1 << slot % 8
+        if score['active']:
+            self.active_slots[slot // 8] |= 1 << slot % 8
+
+        self.intervals += 1
+        self.active_intervals += int(score['active'])
+        self.stake_over_intervals += int(score['percent_of_network'] >= 6.0)
+
+        # Summary keeps the latest interval values
+        self.last_block = score['current_block']
+        self.network_weight = score['network_weight']
+        self.total_stake = score['total_stake']
+        self.active_bid = score['active_bid']
+        self.percent_of_network = score['percent_of_network']
+
+    def get_scores(self) -> list:
+        """Gets unsaved Score objects for recorded slots of the rollup day."""
+
+        recorded_slots, active_slots, scores = bytes(self.recorded_slots), bytes(self.active_slots), []
+
+        for slot in range(self.SLOTS):
+            if not recorded_slots[slot // 8] >> slot % 8 & 1:
+                continue
+
+            # Per interval block heights are not kept after compaction
+            scores.append(Score(
+                node=self.node,
+                current_block=None,
+                network_weight=self.network_weight,
+                total_stake=self.total_stake,
+                active_bid=self.active_bid,
+                percent_of_network=self.percent_of_network,
+                active=bool(active_slots[slot // 8] >> slot % 8 & 1),
+                timestamp=self.get_start() + slot * self.INTERVAL
+            ))
+
+        return scores
+
+
+class Leaderboard(models.Model):
+    """
+        Class for Casper Week Leaderboard Snapshot Position
+    """
+    week = models.CharField(_("Week"), max_length=128)
+    period_start = models.DateField(_("Period Start"), null=True, blank=True)
+    period_end = models.DateField(_("Period End"), null=True, blank=True)
+    public_key = models.CharField(_("Public Key"), max_length=128)
+    rank = models.PositiveIntegerField(_("Rank"))
+    score = models.FloatField(_("Score"), default=0)
+    longevity = models.FloatField(_("Longevity"), default=0)
+    eligible_for_rewards = models.BooleanField(_("Eligible for Rewards"), default=False)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=('week', 'rank',), name='unique_leaderboard_rank'),
+            models.UniqueConstraint(fields=('week', 'public_key',), name='unique_leaderboard_public_key'),
+        ]
+        indexes = [
+            models.Index(fields=('public_key', 'period_start',), name='leaderboard_key_period_idx'),
+            models.Index(fields=('period_start',), name='leaderboard_period_idx'),
+        ]
+        verbose_name = _("Leaderboard")
+        verbose_name_plural = _("Leaderboards")
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+
+    def __str__(self):
+        return f"{self.public_key}"
+
+
+class Cycle(models.Model):
+    """
+        Class for Casper Monitoring Cycle of 5 Minute Interval
+    """
+    STATUS_CHOICES = [
+        ('C', 'Completed'),
+        ('L', 'Late'),
+        ('S', 'Skipped'),
+        ('F', 'Failed')
+    ]
+
+    started = models.DateTimeField(_("Started"), db_index=True)
+    finished = models.DateTimeField(_("Finished"), auto_now_add=True)
+    status = models.CharField(_("Status"), max_length=1, choices=STATUS_CHOICES, default='C')
+    timings = models.JSONField(_("Stage Timings"), default=dict, blank=True)
+    note = models.CharField(_("Note"), max_length=512, default='', blank=True)
+
+    class Meta:
+        verbose_name = _("Cycle")
+        verbose_name_plural = _("Cycles")
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+
+    def __str__(self):
+        return f"{self.started}"
@@ -1,8 +1,88 @@
-from celery import shared_task
+from celery import chord, shared_task
+from celery.signals import task_revoked
+from django.conf import settings
+from django.utils import timezone
 from src.casper import services
 import asyncio
 
 
-@shared_task()
+@shared_task(soft_time_limit=settings.CYCLE_LEASE_TIMEOUT - 30, time_limit=settings.CYCLE_LEASE_TIMEOUT)
 def monitoring():
-    asyncio.run(services.main())
+    if not settings.STATUS_SHARDS:
+        asyncio.run(services.main())
+        return
+
+    cycle = asyncio.run(services.start_sharded_cycle())
+    if not cycle:
+        return
+
+    header = [poll_auction_info.s(cycle['deadline'])] + \
+        [poll_shard.s(peers, cycle['deadline']) for peers in cycle['shards']]
+    task_ids = [signature.freeze().id for signature in header]
+
+    # Interval is written by the callback once auction info and all shards are reported,
+    # shard picked up by a worker after the poll deadline reports its nodes as not polled right away
+    # If a shard fails the callback is not run, so the interval is written from the others by its error callback
+    try:
+        chord(header)(finish_monitoring.s(cycle['token'], cycle['start_time'], cycle['peers_duration']).on_error(
+            fail_monitoring.s(cycle['token'], cycle['start_time'], task_ids, cycle['peers_duration'])
+        ))
+    except Exception as error:
+        services.abort_sharded_cycle(cycle['token'], cycle['start_time'], f'Cycle is not dispatched: {error}')
+        raise
+
+    # Shard lost with its worker never reports, so the interval is written from the others
+    # if the callback has not started once shards are past their soft time limit
+    expire_monitoring.apply_async(
+        (cycle['token'], cycle['start_time'], task_ids, cycle['peers_duration']),
+        countdown=settings.CYCLE_POLL_DEADLINE + 30
+    )
+
+
+@task_revoked.connect
+def skip_monitoring(sender=None, expired=False, **kwargs):
+    # Monitoring message expired in the queue is dropped without running, so its interval is recorded here
+    if expired and getattr(sender, 'name', None) == monitoring.name:
+        services._save_cycle(timezone.now(), 'S', note='Cycle is not started before its deadline')
+
+
+@shared_task(soft_time_limit=settings.CYCLE_POLL_DEADLINE + 30, time_limit=settings.CYCLE_POLL_DEADLINE + 60)
+def poll_shard(peers, deadline):
+    return asyncio.run(services.poll_shard(peers, deadline))
+
+
+@shared_task(soft_time_limit=settings.CYCLE_POLL_DEADLINE + 30, time_limit=settings.CYCLE_POLL_DEADLINE + 60)
+def poll_auction_info(deadline):
+    return asyncio.run(services.poll_auction_info(deadline))
+
+
+@shared_task(soft_time_limit=settings.CYCLE_LEASE_TIMEOUT - 30, time_limit=settings.CYCLE_LEASE_TIMEOUT)
+def finish_monitoring(results, token, start_time, peers_duration):
+    asyncio.run(services.finish_sharded_cycle(results, token, start_time, peers_duration))
+
+
+def _get_results(task_ids):
+    # Results of header tasks which failed or have not finished yet are missing
+    return [result.result if result.ready() and result.successful() else None
+            for result in map(poll_shard.AsyncResult, task_ids)]
+
+
+@shared_task(soft_time_limit=settings.CYCLE_LEASE_TIMEOUT - 30, time_limit=settings.CYCLE_LEASE_TIMEOUT)
+def fail_monitoring(request, exc, traceback, token, start_time, task_ids, peers_duration):
+    asyncio.run(services.recover_sharded_cycle(_get_results(task_ids), token, start_time, peers_duration,
+                                               str(exc).strip() or exc.__class__.__name__))
+
+
+@shared_task(soft_time_limit=settings.CYCLE_LEASE_TIMEOUT - 30, time_limit=settings.CYCLE_LEASE_TIMEOUT)
+def expire_monitoring(token, start_time, task_ids, peers_duration):
+    # Cycle is usually recorded by its callback by now, so shard results are not fetched
+    if services.is_sharded_cycle_closed(token):
+        return
+
+    asyncio.run(services.recover_sharded_cycle(_get_results(task_ids), token, start_time, peers_duration,
+                                               'Poll deadline exceeded'))
+
+
+@shared_task()
+def rollup():
+    asyncio.run(services.rollup_scores())
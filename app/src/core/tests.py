@@ -0,0 +1,99 @@
+import asyncio
+import datetime
+import random
+
+from django.db import transaction
+from django.test import TransactionTestCase
+
+from src.casper import services, vectorized
+from src.core import models
+
+
+class ScoringEngineParityTest(TransactionTestCase):
+    """
+        ORM and vectorized scoring engines produce identical scoring for the same data
+    """
+
+    def setUp(self):
+        rng = random.Random(1)
+        today = datetime.date.today()
+
+        nodes = models.Node.objects.bulk_create(
+            models.Node(ip=f'10.0.0.{index}', public_key=f'01{index:064x}', height=1000) for index in range(120)
+        )
+        # Two nodes may share the same public key
+        nodes[1].public_key = nodes[0].public_key
+        nodes[1].save()
+
+        models.Score.objects.bulk_create(
+            models.Score(node=node, active=rng.random() < 0.8, percent_of_network=rng.choice([1.0] * 20 + [7.0]))
+            for _ in range(12) for node in nodes
+        )
+
+        scorings = []
+        for node in nodes[2:]:
+            for offset in range(-100, 0):
+                day = today + datetime.timedelta(days=offset)
+                scorings.append(models.Scoring(
+                    public_key=node.public_key, type='D', timestamp=day.strftime('%Y.%m.%d'), period_start=day,
+                    period_end=day, score=rng.choice([100.0, 95.0, 40.0]), longevity=rng.random() * 1000,
+                    stake_over=rng.random() < 0.05
+                ))
+            for offset in range(-12, 1):
+                date = datetime.datetime.combine(today + datetime.timedelta(weeks=offset), datetime.time.min)
+                start_of_week, end_of_week, week = asyncio.run(services._get_week(date))
+                scorings.append(models.Scoring(
+                    public_key=node.public_key, type='W', timestamp=week, period_start=start_of_week,
+                    period_end=end_of_week, score=rng.random() * 100, longevity=rng.random() * 1000,
+                    stake_over=rng.random() < 0.05, eligible_for_rewards=rng.random() < 0.7
+                ))
+        models.Scoring.objects.bulk_create(scorings)
+
+    @staticmethod
+    async def _run(step, model=models.Scoring):
+        """Runs scoring step and returns resulting rows of given model, leaving Database untouched."""
+
+        # Steps run inside event loop, so the transaction is opened there to share its connection
+        with transaction.atomic():
+            await step()
+            if model is models.Leaderboard:
+                rows = list(model.objects.order_by('week', 'rank').values_list(
+                    'week', 'rank', 'public_key', 'score', 'longevity', 'eligible_for_rewards'
+                ))
+            else:
+                rows = sorted(model.objects.values_list(
+                    'public_key', 'type', 'timestamp', 'score', 'longevity', 'stake_over', 'eligible_for_rewards'
+                ))
+            transaction.set_rollback(True)
+
+        return rows
+
+    def _assert_parity(self, name):
+        orm_scoring = asyncio.run(self._run(getattr(services, name)))
+        vectorized_scoring = asyncio.run(self._run(getattr(vectorized, name)))
+
+        self.assertEqual(len(orm_scoring), len(vectorized_scoring))
+        for orm_row, vectorized_row in zip(orm_scoring, vectorized_scoring):
+            self.assertEqual(orm_row[:3] + orm_row[5:], vectorized_row[:3] + vectorized_row[5:])
+            # Sums may be accumulated by Database in different order
+            self.assertAlmostEqual(orm_row[3], vectorized_row[3], places=9)
+            self.assertAlmostEqual(orm_row[4], vectorized_row[4], places=9)
+
+    def test_day_scoring(self):
+        self._assert_parity('calculate_day_scoring')
+
+    def test_week_scoring(self):
+        self._assert_parity('calculate_week_scoring')
+
+    def test_eligible_rewards(self):
+        self._assert_parity('determine_eligible_rewards')
+
+    def test_leaderboard(self):
+        orm_leaderboard = asyncio.run(self._run(services.determine_eligible_rewards, models.Leaderboard))
+        vectorized_leaderboard = asyncio.run(self._run(vectorized.determine_eligible_rewards, models.Leaderboard))
+
+        self.assertTrue(orm_leaderboard)
+        self.assertEqual(orm_leaderboard, vectorized_leaderboard)
+
+    def test_quarter_rewards(self):
+        self._assert_parity('calculate_quarter_rewards')